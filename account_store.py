@@ -0,0 +1,211 @@
+import sqlite3
+import sys
+from datetime import datetime
+
+import numpy as np
+
+from risk_scoring import risk_scores
+
+ANALYSIS_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+UNSCORED = -1
+
+# Column dtypes sized to the values they hold instead of 8-byte Python ints.
+# analyzed_at is Unix seconds, which fits uint32 until 2106.
+COLUMNS = {
+    'follower_count': np.uint32,
+    'following_count': np.uint32,
+    'post_count': np.uint32,
+    'bio_length': np.uint16,
+    'is_verified': np.bool_,
+    'is_private': np.bool_,
+    'risk_score': np.int8,
+    'analyzed_at': np.uint32,
+}
+
+def _epoch(analysis_time):
+    return int(datetime.strptime(analysis_time, ANALYSIS_TIME_FORMAT).timestamp()) if analysis_time else 0
+
+def _analysis_time(epoch):
+    return datetime.fromtimestamp(epoch).strftime(ANALYSIS_TIME_FORMAT) if epoch else None
+
+class AccountRecord:
+    """
+    One account's scoring inputs without a per-instance __dict__: the bio is
+    kept only as its length and the analysis time as Unix seconds
+    """
+    __slots__ = ('username',) + tuple(COLUMNS)
+
+    def __init__(self, username, follower_count=0, following_count=0, post_count=0, bio_length=0,
+                 is_verified=False, is_private=False, risk_score=UNSCORED, analyzed_at=0):
+        self.username = sys.intern(username)
+        self.follower_count = follower_count
+        self.following_count = following_count
+        self.post_count = post_count
+        self.bio_length = bio_length
+        self.is_verified = is_verified
+        self.is_private = is_private
+        self.risk_score = risk_score
+        self.analyzed_at = analyzed_at
+
+    @classmethod
+    def from_profile(cls, profile):
+        """From an analysis result dict as returned by InstagramAnalyzer"""
+        return cls(
+            profile['username'],
+            profile['follower_count'],
+            profile['following_count'],
+            profile['post_count'],
+            len((profile.get('bio') or '').strip()),
+            bool(profile['is_verified']),
+            bool(profile['is_private']),
+            profile.get('risk_score', UNSCORED),
+            _epoch(profile.get('analysis_time')),
+        )
+
+    def to_profile(self):
+        """JSON-ready dict using the analysis result's key names"""
+        return {
+            'username': self.username,
+            'follower_count': self.follower_count,
+            'following_count': self.following_count,
+            'post_count': self.post_count,
+            'is_verified': self.is_verified,
+            'is_private': self.is_private,
+            'risk_score': self.risk_score,
+            'is_high_risk': self.risk_score > 70,
+            'analysis_time': _analysis_time(self.analyzed_at),
+        }
+
+class AccountStore:
+    """
+    Struct-of-arrays store for millions of accounts: one typed NumPy column
+    per field plus a list of interned usernames. The scorer reads the columns
+    in place, and a row only becomes a dict when it is serialized.
+    """
+
+    def __init__(self, capacity=1024):
+        self._size = 0
+        self._columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in COLUMNS.items()}
+        self._columns['risk_score'].fill(UNSCORED)
+        self.usernames = []
+        self._index = None  # username -> row, built on the first lookup
+
+    def __len__(self):
+        return self._size
+
+    def column(self, name):
+        """Live view of a column's filled rows (no copy)"""
+        return self._columns[name][:self._size]
+
+    def _reserve(self, extra):
+        needed = self._size + extra
+        capacity = len(self._columns['risk_score'])
+        if needed <= capacity:
+            return
+        capacity = max(needed, capacity * 2)
+        for name, column in self._columns.items():
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            if name == 'risk_score':
+                grown[self._size:] = UNSCORED
+            self._columns[name] = grown
+
+    def append(self, record):
+        """Add an AccountRecord; returns its row"""
+        self._reserve(1)
+        row = self._size
+        for name, column in self._columns.items():
+            column[row] = getattr(record, name)
+        self.usernames.append(record.username)
+        if self._index is not None:
+            self._index[record.username] = row
+        self._size += 1
+        return row
+
+    def append_profile(self, profile):
+        return self.append(AccountRecord.from_profile(profile))
+
+    def extend(self, usernames, **columns):
+        """
+        Append many accounts at once from equal-length column arrays (keyword
+        names from COLUMNS; missing columns keep their defaults)
+        """
+        usernames = [sys.intern(str(username)) for username in usernames]
+        start = self._size
+        self._reserve(len(usernames))
+        for name, values in columns.items():
+            self._columns[name][start:start + len(usernames)] = values
+        self.usernames.extend(usernames)
+        self._size += len(usernames)
+        if self._index is not None:
+            self._index.update(zip(usernames, range(start, self._size)))
+
+    def row(self, username):
+        """Row of a username, or None"""
+        if self._index is None:
+            self._index = {username: row for row, username in enumerate(self.usernames)}
+        return self._index.get(username)
+
+    def record(self, row):
+        return AccountRecord(self.usernames[row], **{
+            name: column[row].item() for name, column in self._columns.items()
+        })
+
+    def to_profile(self, row):
+        return self.record(row).to_profile()
+
+    def iter_profiles(self, rows=None):
+        """JSON-ready dicts, built one at a time so a full dump never holds them all"""
+        for row in range(self._size) if rows is None else rows:
+            yield self.to_profile(row)
+
+    def rescore(self):
+        """Recompute every risk score from the columns and store it; returns the scores view"""
+        scores = risk_scores(
+            self.column('follower_count'),
+            self.column('following_count'),
+            self.column('post_count'),
+            self.column('bio_length'),
+            self.column('is_verified'),
+        )
+        self.column('risk_score')[:] = scores
+        return self.column('risk_score')
+
+    def nbytes(self):
+        """Bytes held by the columns and usernames (the lookup index excluded)"""
+        columns = sum(column.nbytes for column in self._columns.values())
+        names = sys.getsizeof(self.usernames) + sum(sys.getsizeof(username) for username in self.usernames)
+        return columns + names
+
+    @classmethod
+    def from_snapshots(cls, db_path='instagram_data.db', chunk_size=100000):
+        """Load every profile snapshot, chunk by chunk, for bulk re-scoring"""
+        store = cls()
+        conn = sqlite3.connect(db_path)
+        try:
+            cursor = conn.execute('''
+                SELECT username, follower_count, following_count, post_count,
+                       bio, is_verified, risk_score,
+                       CAST(strftime('%s', analyzed_at, 'utc') AS INTEGER)
+                FROM profile_snapshots
+            ''')
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                usernames, followers, following, posts, bios, verified, risk, analyzed = zip(*rows)
+                # Measured as the live scorer does: SQL TRIM only strips spaces
+                bio_length = [len((bio or '').strip()) for bio in bios]
+                store.extend(
+                    usernames,
+                    follower_count=followers,
+                    following_count=following,
+                    post_count=posts,
+                    bio_length=bio_length,
+                    is_verified=verified,
+                    risk_score=risk,
+                    analyzed_at=analyzed,
+                )
+        finally:
+            conn.close()
+        return store
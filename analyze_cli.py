@@ -0,0 +1,32 @@
+"""
+Analyze usernames from files (or stdin) and print one JSON line per account
+as soon as it finishes.
+
+    python analyze_cli.py handles.txt > results.ndjson
+    cat handles.txt | python analyze_cli.py --workers 32
+"""
+import argparse
+import fileinput
+import json
+import sys
+
+from app import BATCH_WORKERS, analyzer
+
+def read_usernames(paths):
+    for line in fileinput.input(paths):
+        username = line.strip()
+        if username:
+            yield username
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('files', nargs='*', help='files with one username per line (default: stdin)')
+    parser.add_argument('--workers', type=int, default=BATCH_WORKERS)
+    args = parser.parse_args()
+
+    for index, result in analyzer.iter_analyze(read_usernames(args.files), max_workers=args.workers):
+        sys.stdout.write(json.dumps({'index': index, **result}) + '\n')
+        sys.stdout.flush()
+
+if __name__ == '__main__':
+    main()
@@ -1,78 +1,369 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
+import json
 import requests
-import re
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import hashlib
+import os
+import sqlite3
+import threading
 from datetime import datetime, timedelta
+from functools import lru_cache
 import random
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from detection_engine import InstagramAccountDetector
+from detection_pipeline import DetectionPipeline
+from identity_graph import IdentityGraph
+from jobs import JobQueue
+from lookalike_index import LookalikeIndex
+import metrics
+from metrics import ANALYSES, STORE_ERRORS, format_timings, request_timings, timed
+from profile_cache import ProfileCache
+from rate_limiter import BATCH, INTERACTIVE, RateLimiter, backoff_delay, retry_after_seconds
+from rename_velocity import RenameTimeline, peak_velocity
+from request_coalescer import RequestCoalescer
+from results_store import ResultStore
+from risk_scoring import risk_score, simulated_risk_score
+from snapshot_store import SnapshotStore, risk_inputs_hash
+from shared_cache import SharedCache
+from static_assets import PAGE_CACHE_CONTROL, StaticAssets, build_asset, respond
+from username_features import UsernameFeatures
+import username_features
 
-app = Flask(__name__)
+# Static files are served fingerprinted and precompressed by StaticAssets, not Flask
+app = Flask(__name__, static_folder=None)
+static_assets = StaticAssets(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static'))
+app.jinja_env.globals['asset_url'] = static_assets.url
+
+REAL_DATA_SOURCE = 'REAL INSTAGRAM API'
+PROFILE_API_URL = os.environ.get('PROFILE_API_URL', 'https://www.instagram.com/api/v1/users/web_profile_info/')
+UPSTREAM_TIMEOUT = 10  # seconds
+
+# Upstream token bucket; 429s pause it for Retry-After (or a jittered backoff)
+UPSTREAM_RATE = float(os.environ.get('UPSTREAM_RATE', 5))  # requests per second
+UPSTREAM_BURST = int(os.environ.get('UPSTREAM_BURST', 10))
+UPSTREAM_ATTEMPTS = 3
+RATE_LIMIT_WAIT = 30  # seconds a request may queue for a token
+MAX_BATCH_SIZE = 500
+BATCH_WORKERS = 16
+
+# Connection pool shared by every request thread
+POOL_CONNECTIONS = 4   # distinct hosts kept in the pool manager
+POOL_MAXSIZE = 32      # keep-alive connections per host, above BATCH_WORKERS
+MAX_RETRIES = 2
+RETRY_BACKOFF = 0.3    # seconds, doubled on every retry
+
+# Real profiles are cached so repeat checks of popular handles skip the upstream API
+PROFILE_CACHE_SIZE = int(os.environ.get('PROFILE_CACHE_SIZE', 1024))
+PROFILE_CACHE_TTL = int(os.environ.get('PROFILE_CACHE_TTL', 600))  # seconds
+PROFILE_CACHE_DB = os.environ.get('PROFILE_CACHE_DB')  # e.g. profile_cache.db, disabled when unset
+# Cache shared by all worker processes on the host, e.g. /dev/shm/instagram_shared_cache.db; disabled when unset
+SHARED_CACHE_PATH = os.environ.get('SHARED_CACHE_PATH')
+SHARED_FETCH_LEASE = UPSTREAM_TIMEOUT * UPSTREAM_ATTEMPTS  # seconds a peer's upstream fetch is waited for
+
+DATABASE_PATH = os.environ.get('DATABASE_PATH', 'instagram_data.db')
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 8))
+RESULTS_DIR = os.environ.get('RESULTS_DIR')  # e.g. analysis_results, needs pyarrow; disabled when unset
+# Seconds between folding new accounts into the linked-account clusters; 0 leaves it to `python identity_graph.py`
+IDENTITY_GRAPH_SYNC = float(os.environ.get('IDENTITY_GRAPH_SYNC', 60))
+
+# Set to make simulated profiles reproducible: the same seed and username always give the same profile
+SIMULATION_SEED = os.environ.get('SIMULATION_SEED')
+
+# Updated headers to bypass basic blocking
+SESSION_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'DNT': '1',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+def stable_hash(value):
+    """Hash that, unlike hash(), is the same in every process"""
+    return int(hashlib.sha256(value.encode('utf-8')).hexdigest()[:12], 16)
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter that reports how often pooled connections are reused"""
+    
+    def pool_stats(self):
+        """Count connection reuses (hits) and new connections (misses) across all host pools"""
+        total_requests = 0
+        new_connections = 0
+        pools = self.poolmanager.pools
+        
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            total_requests += pool.num_requests
+            new_connections += pool.num_connections
+        
+        hits = max(0, total_requests - new_connections)
+        return {
+            'requests': total_requests,
+            'hits': hits,
+            'misses': new_connections,
+            'hit_ratio': round(hits / total_requests, 4) if total_requests else 0.0,
+            'pool_connections': POOL_CONNECTIONS,
+            'pool_maxsize': POOL_MAXSIZE,
+        }
 
 class InstagramAnalyzer:
-    def __init__(self):
-        self.session = requests.Session()
-        # Updated headers to bypass basic blocking
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'DNT': '1',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        })
-    
-    def get_instagram_data(self, username):
+    def __init__(self, cache=None, rate_limiter=None, api_url=PROFILE_API_URL, seed=None, snapshots=None,
+                 results=None):
+        self.api_url = api_url
+        self.seed = seed
+        # Optional SnapshotStore: skips re-scoring accounts whose inputs did not change
+        self.snapshots = snapshots
+        # Optional ResultStore: columnar history of every real and simulated analysis
+        self.results = results
+        self.cache = cache if cache is not None else ProfileCache()
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter(UPSTREAM_RATE, UPSTREAM_BURST)
+        # Concurrent lookups of the same username share one upstream fetch
+        self.coalescer = RequestCoalescer()
+        
+        # One adapter (and therefore one connection pool) is shared by all threads,
+        # while each thread gets its own lightweight Session on top of it
+        self.adapter = PooledAdapter(
+            pool_connections=POOL_CONNECTIONS,
+            pool_maxsize=POOL_MAXSIZE,
+            max_retries=Retry(
+                total=MAX_RETRIES,
+                backoff_factor=RETRY_BACKOFF,
+                status_forcelist=(500, 502, 503, 504),
+                allowed_methods=frozenset(['GET']),
+                raise_on_status=False,
+            ),
+        )
+        self._local = threading.local()
+    
+    @property
+    def session(self):
+        """Session for the calling thread, backed by the shared connection pool"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(SESSION_HEADERS)
+            session.mount('https://', self.adapter)
+            session.mount('http://', self.adapter)
+            self._local.session = session
+        return session
+    
+    def pool_stats(self):
+        """Connection pool hit/miss counters"""
+        return self.adapter.pool_stats()
+    
+    def get_instagram_data(self, username, priority=INTERACTIVE):
         """
         Get Instagram data with fallback to realistic simulation when scraping fails
         """
         try:
             # Try to get real data first
-            real_data = self.try_real_scraping(username)
+            real_data = self.fetch_real_data(username, priority)
             if real_data and not real_data.get('error'):
+                ANALYSES.inc('real')
                 return real_data
             
             # If real scraping fails, use realistic simulation based on common patterns
-            return self.create_realistic_profile(username)
+            with timed('simulation'):
+                profile = self.create_realistic_profile(username)
+            profile['fallback_reason'] = real_data.get('error')
+            ANALYSES.inc('simulated')
+            return profile
             
         except Exception as e:
+            ANALYSES.inc('simulated')
             return self.create_realistic_profile(username)
     
-    def try_real_scraping(self, username):
-        """Attempt to get real Instagram data"""
-        try:
-            url = f"https://www.instagram.com/api/v1/users/web_profile_info/?username={username}"
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                'X-IG-App-ID': '936619743392459',
-                'Accept': '*/*',
-                'Accept-Language': 'en-US,en;q=0.9',
-                'Origin': 'https://www.instagram.com',
-                'Referer': f'https://www.instagram.com/{username}/',
+    def fetch_real_data(self, username, priority=INTERACTIVE):
+        """Return real profile data from the cache, or scrape it and cache the result"""
+        cached = self.cache.get(username)
+        if cached is not None:
+            profile, tier, age = cached
+            profile['cache'] = {
+                'hit': True,
+                'tier': tier,
+                'age_seconds': round(age, 3),
+                'hit_ratio': self.cache.hit_ratio(),
+            }
+            return profile
+        
+        real_data, coalesced = self.coalescer.run(
+            username.strip().lower(),
+            lambda: self.scrape_and_cache(username, priority),
+        )
+        # Every waiter gets its own copy of the shared result
+        real_data = dict(real_data)
+        if not real_data.get('error'):
+            real_data['cache'] = {
+                'hit': False,
+                'tier': None,
+                'age_seconds': 0.0,
+                'hit_ratio': self.cache.hit_ratio(),
+                'coalesced': coalesced,
             }
+        return real_data
+    
+    def scrape_and_cache(self, username, priority=INTERACTIVE):
+        """Scrape a profile upstream and cache it when the scrape succeeds"""
+        # With a shared cache tier, only one worker process on the host goes upstream
+        if not self.cache.claim(username, SHARED_FETCH_LEASE):
+            profile = self.cache.wait_for_peer(username, SHARED_FETCH_LEASE)
+            if profile is not None:
+                return profile
+        
+        try:
+            real_data = self.try_real_scraping(username, priority)
+            if real_data and not real_data.get('error'):
+                self.cache.set(username, real_data)
+        finally:
+            self.cache.release(username)
+        return real_data
+    
+    def analyze_many(self, usernames, max_workers=BATCH_WORKERS):
+        """
+        Analyze several usernames concurrently, returning one result per username in input order
+        """
+        usernames = list(usernames)
+        if not usernames:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(usernames))) as executor:
+            return list(executor.map(self.analyze_one, usernames))
+    
+    def iter_analyze(self, usernames, max_workers=BATCH_WORKERS):
+        """
+        Yield (index, result) pairs in completion order. Usernames are pulled lazily
+        and at most max_workers are in flight, so memory stays flat for any input size
+        """
+        usernames = enumerate(usernames)
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        pending = {}
+        
+        try:
+            for index, username in usernames:
+                pending[executor.submit(self.analyze_one, username)] = index
+                if len(pending) >= max_workers:
+                    break
             
-            response = self.session.get(url, headers=headers, timeout=10)
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield pending.pop(future), future.result()
+                    
+                    # Refill the window with the next username, if any
+                    for index, username in usernames:
+                        pending[executor.submit(self.analyze_one, username)] = index
+                        break
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def analyze_one(self, username, priority=BATCH):
+        """Analyze a single username and wrap the outcome with a status"""
+        if not isinstance(username, str) or not username.strip():
+            return {'username': username, 'status': 'error', 'error': 'Username is required'}
+        
+        username = username.strip()
+        try:
+            result = self.get_instagram_data(username, priority)
+        except Exception as e:
+            return {'username': username, 'status': 'error', 'error': f'Analysis error: {str(e)}'}
+        
+        status = 'real' if result.get('data_source') == REAL_DATA_SOURCE else 'simulated'
+        return {'username': username, 'status': status, 'result': result}
+    
+    def profile_request(self, username):
+        """URL and headers for the upstream web_profile_info call"""
+        url = f"{self.api_url}?username={username}"
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+            'X-IG-App-ID': '936619743392459',
+            'Accept': '*/*',
+            'Accept-Language': 'en-US,en;q=0.9',
+            'Origin': 'https://www.instagram.com',
+            'Referer': f'https://www.instagram.com/{username}/',
+        }
+        return url, headers
+    
+    def build_profile(self, username, user_data):
+        """Normalize the upstream user object into an analysis result"""
+        inputs_hash = None
+        risk_score = None
+        if self.snapshots is not None:
+            inputs_hash = risk_inputs_hash(user_data)
+            try:
+                risk_score = self.snapshots.cached_score(user_data['username'], inputs_hash)
+            except sqlite3.Error:
+                STORE_ERRORS.inc('snapshots')
+        
+        if risk_score is None:
+            with timed('risk_score'):
+                risk_score = self.calculate_risk_score(user_data)
+        
+        profile = {
+            'username': user_data['username'],
+            'full_name': user_data['full_name'],
+            'is_private': user_data['is_private'],
+            'is_verified': user_data['is_verified'],
+            'follower_count': user_data['edge_followed_by']['count'],
+            'following_count': user_data['edge_follow']['count'],
+            'post_count': user_data['edge_owner_to_timeline_media']['count'],
+            'bio': user_data['biography'],
+            'profile_pic': user_data['profile_pic_url_hd'],
+            'risk_score': risk_score,
+            'is_high_risk': risk_score > 70,
+            'data_source': REAL_DATA_SOURCE,
+            'analysis_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'instagram_url': f"https://www.instagram.com/{username}/"
+        }
+        
+        # A failed write (e.g. a lock timeout) must not turn a real profile into a simulated one
+        if self.snapshots is not None:
+            try:
+                self.snapshots.record(profile, inputs_hash)
+            except sqlite3.Error:
+                STORE_ERRORS.inc('snapshots')
+        self.record_result(profile)
+        return profile
+    
+    def record_result(self, profile):
+        """Append to the result history, if enabled; a failed write only counts an error"""
+        if self.results is None:
+            return
+        try:
+            self.results.append(profile)
+        except OSError:
+            STORE_ERRORS.inc('results')
+    
+    def try_real_scraping(self, username, priority=INTERACTIVE):
+        """Attempt to get real Instagram data"""
+        try:
+            url, headers = self.profile_request(username)
             
-            if response.status_code == 200:
-                data = response.json()
-                user_data = data['data']['user']
+            for attempt in range(UPSTREAM_ATTEMPTS):
+                with timed('rate_limit_wait'):
+                    acquired = self.rate_limiter.acquire(priority, timeout=RATE_LIMIT_WAIT)
+                if not acquired:
+                    return {'error': 'Timed out waiting for the upstream rate limiter'}
                 
-                risk_score = self.calculate_risk_score(user_data)
+                with timed('upstream_fetch'):
+                    response = self.session.get(url, headers=headers, timeout=UPSTREAM_TIMEOUT)
+                if response.status_code != 429:
+                    break
                 
-                return {
-                    'username': user_data['username'],
-                    'full_name': user_data['full_name'],
-                    'is_private': user_data['is_private'],
-                    'is_verified': user_data['is_verified'],
-                    'follower_count': user_data['edge_followed_by']['count'],
-                    'following_count': user_data['edge_follow']['count'],
-                    'post_count': user_data['edge_owner_to_timeline_media']['count'],
-                    'bio': user_data['biography'],
-                    'profile_pic': user_data['profile_pic_url_hd'],
-                    'risk_score': risk_score,
-                    'is_high_risk': risk_score > 70,
-                    'data_source': 'REAL INSTAGRAM API',
-                    'analysis_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                    'instagram_url': f"https://www.instagram.com/{username}/"
-                }
+                # Rate limited: hold back every caller, not just this one
+                delay = retry_after_seconds(response.headers.get('Retry-After'))
+                self.rate_limiter.penalize(backoff_delay(attempt) if delay is None else delay + random.uniform(0, 1))
+            else:
+                return {'error': 'Instagram rate limited the request'}
+            
+            if response.status_code == 200:
+                with timed('json_parse'):
+                    data = response.json()
+                return self.build_profile(username, data['data']['user'])
             else:
                 return {'error': 'Could not access Instagram data'}
                 
@@ -81,22 +372,24 @@ class InstagramAnalyzer:
     
     def create_realistic_profile(self, username):
         """Create realistic profile data when scraping fails"""
+        rng = self.simulation_rng(username)
+        
         # Generate realistic data based on username patterns
-        base_followers = self.estimate_followers_from_username(username)
-        base_posts = self.estimate_posts_from_username(username)
+        base_followers = self.estimate_followers_from_username(username, rng)
+        base_posts = self.estimate_posts_from_username(username, rng)
         
         risk_score = self.calculate_simulated_risk(username, base_followers, base_posts)
         
-        return {
+        profile = {
             'username': username,
             'full_name': self.generate_realistic_name(username),
-            'is_private': random.choice([True, False]),
-            'is_verified': random.random() < 0.1,  # 10% chance of verification
+            'is_private': rng.choice([True, False]),
+            'is_verified': rng.random() < 0.1,  # 10% chance of verification
             'follower_count': base_followers,
-            'following_count': random.randint(base_followers // 2, base_followers * 2),
+            'following_count': rng.randint(base_followers // 2, base_followers * 2),
             'post_count': base_posts,
-            'bio': self.generate_realistic_bio(username),
-            'profile_pic': f"https://picsum.photos/200/200?random={hash(username)}",
+            'bio': self.generate_realistic_bio(username, rng),
+            'profile_pic': f"https://picsum.photos/200/200?random={stable_hash(username)}",
             'risk_score': risk_score,
             'is_high_risk': risk_score > 70,
             'data_source': 'REALISTIC SIMULATION (Instagram blocked real access)',
@@ -104,22 +397,32 @@ class InstagramAnalyzer:
             'instagram_url': f"https://www.instagram.com/{username}/",
             'note': 'Using realistic simulation. Enable VPN or try different network for real data.'
         }
+        
+        self.record_result(profile)
+        return profile
     
-    def estimate_followers_from_username(self, username):
+    def simulation_rng(self, username):
+        """Random source for simulating a profile; seeded per username when a seed is set"""
+        if self.seed is None:
+            return random
+        return random.Random(f"{self.seed}:{username}")
+    
+    def estimate_followers_from_username(self, username, rng=random):
         """Estimate realistic follower count based on username patterns"""
-        if re.search(r'official|real|verified', username.lower()):
-            return random.randint(50000, 500000)
-        elif re.search(r'\d{4}', username) or len(username) < 6:
-            return random.randint(100, 1000)  # Suspicious pattern
+        features = UsernameFeatures.from_username(username)
+        if features.has_brand_keyword:
+            return rng.randint(50000, 500000)
+        elif features.has_digit_run or features.length < 6:
+            return rng.randint(100, 1000)  # Suspicious pattern
         else:
-            return random.randint(1000, 50000)  # Normal account
+            return rng.randint(1000, 50000)  # Normal account
     
-    def estimate_posts_from_username(self, username):
+    def estimate_posts_from_username(self, username, rng=random):
         """Estimate realistic post count"""
         if len(username) < 5:
-            return random.randint(0, 10)  # New/suspicious account
+            return rng.randint(0, 10)  # New/suspicious account
         else:
-            return random.randint(10, 500)  # Established account
+            return rng.randint(10, 500)  # Established account
     
     def generate_realistic_name(self, username):
         """Generate realistic full name"""
@@ -137,7 +440,7 @@ class InstagramAnalyzer:
                 return name
         return username.title()
     
-    def generate_realistic_bio(self, username):
+    def generate_realistic_bio(self, username, rng=random):
         """Generate realistic bio"""
         bios = [
             "Digital creator • Photography enthusiast 📸",
@@ -148,367 +451,110 @@ class InstagramAnalyzer:
             "Life is what happens between posts 🌈",
             ""
         ]
-        return random.choice(bios)
+        return rng.choice(bios)
     
     def calculate_risk_score(self, user_data):
         """Calculate risk score from real data"""
-        score = 0
-        
-        followers = user_data['edge_followed_by']['count']
-        following = user_data['edge_follow']['count']
-        posts = user_data['edge_owner_to_timeline_media']['count']
-        
-        # Follower ratio analysis
-        if following > 0:
-            ratio = followers / following
-            if ratio < 0.01:
-                score += 40
-            elif ratio < 0.1:
-                score += 25
-            elif ratio < 0.5:
-                score += 10
-        
-        # Post activity
-        if posts == 0:
-            score += 30
-        elif posts < 5:
-            score += 20
-        elif posts < 10:
-            score += 10
-        
-        # Profile completeness
-        if not user_data['biography'] or len(user_data['biography'].strip()) < 10:
-            score += 15
-        
-        # Verification status
-        if not user_data['is_verified']:
-            score += 5
-        
-        return min(100, score)
+        bio = user_data['biography']
+        
+        return risk_score(
+            user_data['edge_followed_by']['count'],
+            user_data['edge_follow']['count'],
+            user_data['edge_owner_to_timeline_media']['count'],
+            len(bio.strip()) if bio else 0,
+            user_data['is_verified'],
+        )
     
     def calculate_simulated_risk(self, username, followers, posts):
         """Calculate risk score for simulated data"""
-        score = 0
-        
-        # Username pattern analysis
-        if re.search(r'\d{4,}', username):
-            score += 20
-        if re.search(r'[._-]{3,}', username):
-            score += 15
-        if len(username) < 5:
-            score += 25
-        
-        # Follower-post ratio
-        if posts > 0:
-            ratio = followers / posts
-            if ratio > 1000:  # Many followers, few posts
-                score += 20
-            elif ratio < 1:   # Many posts, few followers
-                score += 15
-        
-        # Account activity level
-        if posts < 5:
-            score += 20
-        elif posts < 10:
-            score += 10
+        features = UsernameFeatures.from_username(username)
         
-        return min(100, score)
+        return simulated_risk_score(
+            features.length,
+            features.has_digit_run,
+            features.has_separator_run,
+            followers,
+            posts,
+        )
+
+# Process-wide analyzer shared by all request threads
+shared_cache = SharedCache(SHARED_CACHE_PATH, ttl=PROFILE_CACHE_TTL) if SHARED_CACHE_PATH else None
+
+analyzer = InstagramAnalyzer(cache=ProfileCache(
+    max_entries=PROFILE_CACHE_SIZE,
+    ttl=PROFILE_CACHE_TTL,
+    db_path=PROFILE_CACHE_DB,
+    shared=shared_cache,
+), seed=SIMULATION_SEED, snapshots=SnapshotStore(DATABASE_PATH),
+   results=ResultStore(RESULTS_DIR) if RESULTS_DIR else None)
+
+# Background bulk scans, persisted next to the account data
+job_queue = JobQueue(DATABASE_PATH, analyzer, workers=JOB_WORKERS)
+rename_timeline = RenameTimeline(DATABASE_PATH)
+# Built and kept current offline with `python lookalike_index.py`
+lookalike_index = LookalikeIndex(DATABASE_PATH)
+# Clusters are stored in the database and shared by every process; only the
+# serving process keeps them current (see start_background_work)
+identity_graph = IdentityGraph(DATABASE_PATH)
+detection = DetectionPipeline(
+    analyzer,
+    InstagramAccountDetector(DATABASE_PATH, identity_graph=identity_graph, cache=shared_cache,
+                             lookalike_index=lookalike_index),
+)
+
+metrics.register_gauge('profile_cache_hit_ratio', 'Profile cache hit ratio', analyzer.cache.hit_ratio)
+metrics.register_gauge('http_pool_hits', 'Requests served on a reused upstream connection',
+                       lambda: analyzer.pool_stats()['hits'])
+metrics.register_gauge('http_pool_misses', 'Upstream connections opened',
+                       lambda: analyzer.pool_stats()['misses'])
+metrics.register_gauge('upstream_rate_limiter_waiting', 'Requests queued for an upstream token',
+                       lambda: analyzer.rate_limiter.stats()['waiting'])
+
+_background_started = False
+_background_lock = threading.Lock()
+
+def start_background_work():
+    """
+    Start the serving process's background threads once: the scan workers,
+    which resume scans interrupted by a crash, and identity-graph sync. Run
+    from __main__ and, for other WSGI servers, on the first request, so
+    importing app (analyze_cli, asgi_app, benchmarks) starts nothing.
+    """
+    global _background_started
+    with _background_lock:
+        if _background_started:
+            return
+        _background_started = True
+    job_queue.start()
+    if IDENTITY_GRAPH_SYNC > 0:
+        identity_graph.start(IDENTITY_GRAPH_SYNC)
+
+@app.before_request
+def ensure_background_work():
+    if not _background_started:
+        start_background_work()
+
+def send_asset(asset):
+    status, headers, body = respond(
+        asset, request.headers.get('Accept-Encoding'), request.headers.get('If-None-Match')
+    )
+    return Response(body, status=status, headers=headers)
+
+@lru_cache(maxsize=None)
+def home_page():
+    # The page only changes on deploy, so render and compress it once
+    return build_asset(render_template('index.html').encode('utf-8'), 'text/html; charset=utf-8', PAGE_CACHE_CONTROL)
 
 @app.route('/')
 def home():
-    return '''
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Instagram Account Analyzer</title>
-        <style>
-            * {
-                margin: 0;
-                padding: 0;
-                box-sizing: border-box;
-            }
-            body {
-                font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                min-height: 100vh;
-                padding: 20px;
-            }
-            .container {
-                max-width: 900px;
-                margin: 0 auto;
-                background: white;
-                border-radius: 15px;
-                box-shadow: 0 20px 40px rgba(0,0,0,0.1);
-                overflow: hidden;
-            }
-            .header {
-                background: linear-gradient(135deg, #E1306C, #C13584);
-                color: white;
-                padding: 30px;
-                text-align: center;
-            }
-            .header h1 {
-                font-size: 2.2em;
-                margin-bottom: 10px;
-            }
-            .content {
-                padding: 30px;
-            }
-            .search-box {
-                display: flex;
-                gap: 10px;
-                margin-bottom: 20px;
-            }
-            input[type="text"] {
-                flex: 1;
-                padding: 15px;
-                border: 2px solid #ddd;
-                border-radius: 8px;
-                font-size: 16px;
-            }
-            button {
-                background: #E1306C;
-                color: white;
-                padding: 15px 30px;
-                border: none;
-                border-radius: 8px;
-                cursor: pointer;
-                font-size: 16px;
-                font-weight: bold;
-            }
-            button:hover {
-                background: #C13584;
-            }
-            .result {
-                margin-top: 30px;
-                display: none;
-            }
-            .risk-high { background: #ffebee; border: 2px solid #f44336; }
-            .risk-medium { background: #fff3e0; border: 2px solid #ff9800; }
-            .risk-low { background: #e8f5e8; border: 2px solid #4caf50; }
-            .result-content {
-                padding: 25px;
-                border-radius: 10px;
-            }
-            .risk-badge {
-                padding: 8px 16px;
-                border-radius: 20px;
-                font-weight: bold;
-                color: white;
-                margin-left: 10px;
-            }
-            .badge-high { background: #f44336; }
-            .badge-medium { background: #ff9800; }
-            .badge-low { background: #4caf50; }
-            .data-source {
-                background: #e3f2fd;
-                padding: 10px;
-                border-radius: 5px;
-                margin: 10px 0;
-                font-size: 0.9em;
-            }
-            .stats-grid {
-                display: grid;
-                grid-template-columns: repeat(auto-fit, minmax(150px, 1fr));
-                gap: 15px;
-                margin: 20px 0;
-            }
-            .stat-item {
-                text-align: center;
-                padding: 15px;
-                background: #f8f9fa;
-                border-radius: 8px;
-            }
-            .stat-value {
-                font-size: 1.4em;
-                font-weight: bold;
-                color: #E1306C;
-            }
-            .profile-header {
-                display: flex;
-                align-items: center;
-                margin-bottom: 20px;
-                padding: 20px;
-                background: #f8f9fa;
-                border-radius: 10px;
-            }
-            .profile-info {
-                flex: 1;
-            }
-            .instagram-link {
-                display: inline-block;
-                background: #E1306C;
-                color: white;
-                padding: 10px 20px;
-                border-radius: 25px;
-                text-decoration: none;
-                margin-top: 10px;
-            }
-            .loading {
-                text-align: center;
-                padding: 30px;
-                color: #666;
-            }
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h1>🔍 Instagram Account Analyzer</h1>
-                <p>Get detailed analysis of any Instagram account</p>
-            </div>
-            
-            <div class="content">
-                <div class="search-box">
-                    <input type="text" id="username" placeholder="Enter Instagram username (e.g., harini_kannan_18)" value="harini_kannan_18">
-                    <button onclick="analyzeAccount()">Analyze Account</button>
-                </div>
-                
-                <div id="result" class="result">
-                    <div id="resultContent"></div>
-                </div>
-            </div>
-        </div>
-
-        <script>
-            async function analyzeAccount() {
-                const username = document.getElementById('username').value.trim();
-                const resultDiv = document.getElementById('result');
-                const resultContent = document.getElementById('resultContent');
-                
-                if (!username) {
-                    alert('Please enter a username');
-                    return;
-                }
-                
-                resultContent.innerHTML = `
-                    <div class="loading">
-                        <h3>🔍 Analyzing @${username}</h3>
-                        <p>Fetching account data...</p>
-                    </div>
-                `;
-                resultDiv.style.display = 'block';
-                
-                try {
-                    const response = await fetch('/analyze', {
-                        method: 'POST',
-                        headers: {'Content-Type': 'application/json'},
-                        body: JSON.stringify({username: username})
-                    });
-                    
-                    const data = await response.json();
-                    
-                    if (data.error) {
-                        resultContent.innerHTML = `
-                            <div class="result-content risk-high">
-                                <h3>❌ Error</h3>
-                                <p>${data.error}</p>
-                                <p><small>Try using a VPN or different network</small></p>
-                            </div>
-                        `;
-                        return;
-                    }
-                    
-                    displayResults(data);
-                    
-                } catch (error) {
-                    resultContent.innerHTML = `
-                        <div class="result-content risk-high">
-                            <h3>❌ Network Error</h3>
-                            <p>Please check your connection and try again</p>
-                        </div>
-                    `;
-                }
-            }
-            
-            function displayResults(data) {
-                const resultDiv = document.getElementById('result');
-                const resultContent = document.getElementById('resultContent');
-                
-                let riskClass = 'risk-low';
-                let riskBadge = '<span class="risk-badge badge-low">LOW RISK</span>';
-                if (data.risk_score > 70) {
-                    riskClass = 'risk-high';
-                    riskBadge = '<span class="risk-badge badge-high">HIGH RISK</span>';
-                } else if (data.risk_score > 40) {
-                    riskClass = 'risk-medium';
-                    riskBadge = '<span class="risk-badge badge-medium">MEDIUM RISK</span>';
-                }
-                
-                resultContent.innerHTML = `
-                    <div class="result-content ${riskClass}">
-                        <div class="profile-header">
-                            <div class="profile-info">
-                                <h2>@${data.username} ${riskBadge}</h2>
-                                <p><strong>${data.full_name}</strong></p>
-                                <p>${data.bio || 'No bio available'}</p>
-                                <a href="${data.instagram_url}" target="_blank" class="instagram-link">
-                                    🔗 View Instagram Profile
-                                </a>
-                            </div>
-                        </div>
-                        
-                        <div class="data-source">
-                            <strong>Data Source:</strong> ${data.data_source}<br>
-                            <strong>Analysis Time:</strong> ${data.analysis_time}
-                            ${data.note ? `<br><strong>Note:</strong> ${data.note}` : ''}
-                        </div>
-                        
-                        <div class="stats-grid">
-                            <div class="stat-item">
-                                <div class="stat-value">${data.follower_count.toLocaleString()}</div>
-                                <div>Followers</div>
-                            </div>
-                            <div class="stat-item">
-                                <div class="stat-value">${data.following_count.toLocaleString()}</div>
-                                <div>Following</div>
-                            </div>
-                            <div class="stat-item">
-                                <div class="stat-value">${data.post_count.toLocaleString()}</div>
-                                <div>Posts</div>
-                            </div>
-                            <div class="stat-item">
-                                <div class="stat-value">${data.risk_score}%</div>
-                                <div>Risk Score</div>
-                            </div>
-                        </div>
-                        
-                        <div style="margin: 20px 0;">
-                            <p><strong>Account Status:</strong></p>
-                            <p>✅ Verified: ${data.is_verified ? 'Yes' : 'No'}</p>
-                            <p>🔒 Private: ${data.is_private ? 'Yes' : 'No'}</p>
-                            <p>🎯 Risk Level: ${data.is_high_risk ? '🚨 HIGH RISK' : '⚠️ MEDIUM/LOW RISK'}</p>
-                        </div>
-                        
-                        <div style="background: #f8f9fa; padding: 15px; border-radius: 8px;">
-                            <h4>📊 Risk Analysis Factors:</h4>
-                            <ul style="margin-left: 20px;">
-                                <li>Follower/Following ratio</li>
-                                <li>Post activity level</li>
-                                <li>Profile completeness</li>
-                                <li>Username patterns</li>
-                                <li>Verification status</li>
-                            </ul>
-                        </div>
-                    </div>
-                `;
-                
-                resultDiv.className = `result ${riskClass}`;
-            }
-            
-            // Enter key support and auto-load example
-            document.getElementById('username').addEventListener('keypress', function(e) {
-                if (e.key === 'Enter') analyzeAccount();
-            });
-            
-            // Auto-analyze the example on page load
-            window.addEventListener('load', function() {
-                setTimeout(analyzeAccount, 1000);
-            });
-        </script>
-    </body>
-    </html>
-    '''
+    return send_asset(home_page())
+
+@app.route('/static/<path:filename>')
+def static_file(filename):
+    asset = static_assets.get(filename)
+    if asset is None:
+        return jsonify({'error': 'Not found'}), 404
+    return send_asset(asset)
 
 @app.route('/analyze', methods=['POST'])
 def analyze_account():
@@ -519,7 +565,14 @@ def analyze_account():
         if not username:
             return jsonify({'error': 'Username is required'}), 400
         
-        analyzer = InstagramAnalyzer()
+        # Clients can ask for a per-stage latency breakdown with an X-Timing request header
+        if request.headers.get('X-Timing'):
+            with request_timings() as timings:
+                result = analyzer.get_instagram_data(username)
+            response = jsonify(result)
+            response.headers['X-Timing'] = format_timings(timings)
+            return response
+        
         result = analyzer.get_instagram_data(username)
         
         return jsonify(result)
@@ -527,5 +580,205 @@ def analyze_account():
     except Exception as e:
         return jsonify({'error': f'Analysis error: {str(e)}'}), 500
 
+@app.route('/detect', methods=['POST'])
+def detect_account():
+    """Profile analysis and linked-account evidence merged into one verdict"""
+    try:
+        data = request.get_json()
+        username = data.get('username', '').strip()
+        
+        if not username:
+            return jsonify({'error': 'Username is required'}), 400
+        
+        if request.headers.get('X-Timing'):
+            with request_timings() as timings:
+                result = detection.detect(username)
+            response = jsonify(result)
+            response.headers['X-Timing'] = format_timings(timings)
+            return response
+        
+        return jsonify(detection.detect(username))
+        
+    except Exception as e:
+        return jsonify({'error': f'Detection error: {str(e)}'}), 500
+
+@app.route('/lookalikes', methods=['GET'])
+def lookalikes():
+    """Known accounts whose current or past handle nearly matches a username"""
+    username = request.args.get('username', '').strip()
+    if not username:
+        return jsonify({'error': 'Username is required'}), 400
+    
+    try:
+        limit = min(int(request.args.get('limit', 10)), 100)
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    
+    matches = lookalike_index.search(username, limit)
+    return jsonify({'username': username, 'count': len(matches), 'lookalikes': matches})
+
+@app.route('/renames/timeline', methods=['GET'])
+def rename_history():
+    """An account's renames with rolling 24h/7d/30d counts and its peak per window"""
+    username = request.args.get('username', '').strip()
+    if not username:
+        return jsonify({'error': 'Username is required'}), 400
+    
+    timeline = rename_timeline.timeline(username)
+    return jsonify({
+        'username': username,
+        'renames': timeline,
+        'velocity': peak_velocity(timeline),
+    })
+
+@app.route('/renames/bursts', methods=['GET'])
+def rename_bursts():
+    """Accounts with at least `min` renames inside one 24h/7d/30d window, across the whole table"""
+    try:
+        min_renames = int(request.args.get('min', 3))
+        limit = min(int(request.args.get('limit', 100)), 10000)
+        bursts = rename_timeline.bursts(
+            min_renames,
+            window=request.args.get('window', '24h'),
+            since=request.args.get('since'),
+            limit=limit,
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({'count': len(bursts), 'bursts': bursts})
+
+@app.route('/analyze/batch', methods=['POST'])
+def analyze_batch():
+    try:
+        data = request.get_json()
+        usernames = data.get('usernames')
+        
+        if not isinstance(usernames, list) or not usernames:
+            return jsonify({'error': 'A non-empty list of usernames is required'}), 400
+        if len(usernames) > MAX_BATCH_SIZE:
+            return jsonify({'error': f'At most {MAX_BATCH_SIZE} usernames per batch'}), 400
+        
+        results = analyzer.analyze_many(usernames)
+        
+        return jsonify({'count': len(results), 'results': results})
+        
+    except Exception as e:
+        return jsonify({'error': f'Batch analysis error: {str(e)}'}), 500
+
+@app.route('/analyze/stream', methods=['POST'])
+def analyze_stream():
+    """
+    Stream one NDJSON line per account as soon as it is analyzed. Accepts a JSON
+    body {"usernames": [...]} or a plain-text body with one username per line
+    """
+    if request.is_json:
+        usernames = (request.get_json() or {}).get('usernames')
+        if not isinstance(usernames, list):
+            return jsonify({'error': 'A list of usernames is required'}), 400
+    else:
+        # Read the body lazily instead of buffering the whole list
+        usernames = (line.decode('utf-8').strip() for line in request.stream)
+        usernames = (username for username in usernames if username)
+    
+    def generate():
+        for index, result in analyzer.iter_analyze(usernames):
+            yield json.dumps({'index': index, **result}) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    try:
+        data = request.get_json()
+        usernames = data.get('usernames')
+        
+        if not isinstance(usernames, list) or not usernames:
+            return jsonify({'error': 'A non-empty list of usernames is required'}), 400
+        
+        job_id = job_queue.create_job(usernames)
+        
+        return jsonify(job_queue.progress(job_id)), 202
+        
+    except Exception as e:
+        return jsonify({'error': f'Job error: {str(e)}'}), 500
+
+@app.route('/jobs/<int:job_id>', methods=['GET'])
+def job_progress(job_id):
+    progress = job_queue.progress(job_id)
+    if progress is None:
+        return jsonify({'error': f'Job {job_id} not found'}), 404
+    return jsonify(progress)
+
+@app.route('/jobs/<int:job_id>/results', methods=['GET'])
+def job_results(job_id):
+    try:
+        offset = int(request.args.get('offset', 0))
+        limit = min(int(request.args.get('limit', 100)), 1000)
+    except ValueError:
+        return jsonify({'error': 'offset and limit must be integers'}), 400
+    
+    if job_queue.progress(job_id) is None:
+        return jsonify({'error': f'Job {job_id} not found'}), 404
+    return jsonify({'job_id': job_id, 'offset': offset, 'results': job_queue.results(job_id, offset, limit)})
+
+@app.route('/jobs/<int:job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    if job_queue.progress(job_id) is None:
+        return jsonify({'error': f'Job {job_id} not found'}), 404
+    job_queue.cancel(job_id)
+    return jsonify(job_queue.progress(job_id))
+
+@app.route('/history', methods=['GET'])
+def analysis_history():
+    """Stored analyses filtered by username and/or an analysis time window [start, end)"""
+    if analyzer.results is None:
+        return jsonify({'error': 'Result history is disabled (set RESULTS_DIR)'}), 404
+    
+    try:
+        start = request.args.get('start')
+        end = request.args.get('end')
+        start = datetime.fromisoformat(start) if start else None
+        end = datetime.fromisoformat(end) if end else None
+        limit = min(int(request.args.get('limit', 1000)), 10000)
+    except ValueError:
+        return jsonify({'error': 'start/end must be ISO dates and limit an integer'}), 400
+    
+    table = analyzer.results.query(request.args.get('username'), start, end)
+    rows = table.slice(0, limit).to_pylist()
+    for row in rows:
+        row['analysis_time'] = row['analysis_time'].strftime('%Y-%m-%d %H:%M:%S')
+    
+    return jsonify({'count': table.num_rows, 'results': rows})
+
+@app.route('/changes', methods=['GET'])
+def risk_changes():
+    """Accounts whose risk score moved after the given change cursor"""
+    try:
+        since = int(request.args.get('since', 0))
+        limit = min(int(request.args.get('limit', 1000)), 10000)
+    except ValueError:
+        return jsonify({'error': 'since and limit must be integers'}), 400
+    
+    return jsonify(analyzer.snapshots.changes_since(since, limit))
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/stats', methods=['GET'])
+def stats():
+    return jsonify({
+        'pool': analyzer.pool_stats(),
+        'cache': analyzer.cache.stats(),
+        'rate_limiter': analyzer.rate_limiter.stats(),
+        'coalescing': analyzer.coalescer.stats(),
+        'username_features': username_features.cache_stats(),
+        'shared_cache': shared_cache.stats() if shared_cache is not None else None,
+    })
+
 if __name__ == '__main__':
+    # Start right away, but only in the reloader's serving process
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background_work()
     app.run(debug=True, host='127.0.0.1', port=5000)
\ No newline at end of file
@@ -0,0 +1,281 @@
+"""
+Async serving mode: an ASGI application whose upstream fetches run on a
+non-blocking HTTP client, so one process can hold thousands of slow
+Instagram responses open at once.
+
+    uvicorn asgi_app:app --host 127.0.0.1 --port 5001
+"""
+import asyncio
+import json
+import random
+
+import httpx
+
+from app import (
+    DATABASE_PATH,
+    MAX_BATCH_SIZE,
+    PROFILE_CACHE_DB,
+    PROFILE_CACHE_SIZE,
+    PROFILE_CACHE_TTL,
+    REAL_DATA_SOURCE,
+    RESULTS_DIR,
+    SESSION_HEADERS,
+    SHARED_CACHE_PATH,
+    SIMULATION_SEED,
+    UPSTREAM_ATTEMPTS,
+    UPSTREAM_TIMEOUT,
+    InstagramAnalyzer,
+)
+import metrics
+from metrics import ANALYSES, timed
+from profile_cache import ProfileCache
+from rate_limiter import backoff_delay, retry_after_seconds
+from results_store import ResultStore
+from shared_cache import SharedCache
+from snapshot_store import SnapshotStore
+
+ASYNC_MAX_CONCURRENCY = 2000    # upstream fetches in flight per process
+ASYNC_KEEPALIVE_CONNECTIONS = 100
+
+class AsyncInstagramAnalyzer(InstagramAnalyzer):
+    """InstagramAnalyzer whose upstream calls are awaited instead of blocking a thread"""
+
+    def __init__(self, cache=None, rate_limiter=None, max_concurrency=ASYNC_MAX_CONCURRENCY, **kwargs):
+        super().__init__(cache, rate_limiter, **kwargs)
+        self.max_concurrency = max_concurrency
+        self._client = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._in_flight = {}  # username -> Future shared by concurrent lookups
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers=SESSION_HEADERS,
+                timeout=UPSTREAM_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=ASYNC_KEEPALIVE_CONNECTIONS,
+                ),
+            )
+        return self._client
+
+    async def _cache_call(self, method, *args):
+        # The disk and shared tiers are SQLite, so only a memory-only cache is called on the loop
+        if self.cache.db_path is None and self.cache.shared is None:
+            return method(*args)
+        return await asyncio.to_thread(method, *args)
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def try_real_scraping_async(self, username):
+        """Attempt to get real Instagram data without blocking the event loop"""
+        try:
+            url, headers = self.profile_request(username)
+
+            for attempt in range(UPSTREAM_ATTEMPTS):
+                while (delay := self.rate_limiter.reserve()) > 0:
+                    await asyncio.sleep(delay)
+
+                async with self._semaphore:
+                    with timed('upstream_fetch'):
+                        response = await self.client.get(url, headers=headers)
+                if response.status_code != 429:
+                    break
+
+                delay = retry_after_seconds(response.headers.get('Retry-After'))
+                self.rate_limiter.penalize(backoff_delay(attempt) if delay is None else delay + random.uniform(0, 1))
+            else:
+                return {'error': 'Instagram rate limited the request'}
+
+            if response.status_code == 200:
+                with timed('json_parse'):
+                    data = response.json()
+                # Snapshot and result-history writes are blocking SQLite/file I/O
+                return await asyncio.to_thread(self.build_profile, username, data['data']['user'])
+            else:
+                return {'error': 'Could not access Instagram data'}
+
+        except Exception as e:
+            return {'error': 'Instagram API access failed'}
+
+    async def fetch_real_data_async(self, username):
+        """Cached, coalesced variant of fetch_real_data"""
+        cached = await self._cache_call(self.cache.get, username)
+        if cached is not None:
+            profile, tier, age = cached
+            profile['cache'] = {
+                'hit': True,
+                'tier': tier,
+                'age_seconds': round(age, 3),
+                'hit_ratio': self.cache.hit_ratio(),
+            }
+            return profile
+
+        key = username.strip().lower()
+        future = self._in_flight.get(key)
+        coalesced = future is not None
+
+        if coalesced:
+            real_data = await asyncio.shield(future)
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self._in_flight[key] = future
+            try:
+                real_data = await self.try_real_scraping_async(username)
+                if not real_data.get('error'):
+                    await self._cache_call(self.cache.set, username, real_data)
+                future.set_result(real_data)
+            except BaseException:
+                future.cancel()
+                raise
+            finally:
+                del self._in_flight[key]
+
+        real_data = dict(real_data)
+        if not real_data.get('error'):
+            real_data['cache'] = {
+                'hit': False,
+                'tier': None,
+                'age_seconds': 0.0,
+                'hit_ratio': self.cache.hit_ratio(),
+                'coalesced': coalesced,
+            }
+        return real_data
+
+    async def get_instagram_data_async(self, username):
+        """Async get_instagram_data: real data when reachable, simulation otherwise"""
+        try:
+            real_data = await self.fetch_real_data_async(username)
+            if real_data and not real_data.get('error'):
+                ANALYSES.inc('real')
+                return real_data
+            # Appends to the result history, blocking file I/O like build_profile's
+            with timed('simulation'):
+                profile = await asyncio.to_thread(self.create_realistic_profile, username)
+            profile['fallback_reason'] = real_data.get('error')
+            ANALYSES.inc('simulated')
+            return profile
+        except Exception as e:
+            ANALYSES.inc('simulated')
+            return await asyncio.to_thread(self.create_realistic_profile, username)
+
+    async def analyze_one_async(self, username):
+        if not isinstance(username, str) or not username.strip():
+            return {'username': username, 'status': 'error', 'error': 'Username is required'}
+
+        username = username.strip()
+        result = await self.get_instagram_data_async(username)
+        status = 'real' if result.get('data_source') == REAL_DATA_SOURCE else 'simulated'
+        return {'username': username, 'status': status, 'result': result}
+
+    async def analyze_many_async(self, usernames):
+        """Analyze every username concurrently; results keep the input order"""
+        return await asyncio.gather(*(self.analyze_one_async(username) for username in usernames))
+
+async_analyzer = AsyncInstagramAnalyzer(cache=ProfileCache(
+    max_entries=PROFILE_CACHE_SIZE,
+    ttl=PROFILE_CACHE_TTL,
+    db_path=PROFILE_CACHE_DB,
+    shared=SharedCache(SHARED_CACHE_PATH, ttl=PROFILE_CACHE_TTL) if SHARED_CACHE_PATH else None,
+), seed=SIMULATION_SEED, snapshots=SnapshotStore(DATABASE_PATH),
+   results=ResultStore(RESULTS_DIR) if RESULTS_DIR else None)
+
+async def read_json(receive):
+    body = b''
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            break
+    return json.loads(body) if body else {}
+
+async def send_json(send, payload, status=200):
+    body = json.dumps(payload).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode('ascii')),
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+async def analyze_account(receive, send):
+    data = await read_json(receive)
+    username = (data.get('username') or '').strip()
+
+    if not username:
+        return await send_json(send, {'error': 'Username is required'}, 400)
+
+    result = await async_analyzer.get_instagram_data_async(username)
+    await send_json(send, result)
+
+async def analyze_batch(receive, send):
+    data = await read_json(receive)
+    usernames = data.get('usernames')
+
+    if not isinstance(usernames, list) or not usernames:
+        return await send_json(send, {'error': 'A non-empty list of usernames is required'}, 400)
+    if len(usernames) > MAX_BATCH_SIZE:
+        return await send_json(send, {'error': f'At most {MAX_BATCH_SIZE} usernames per batch'}, 400)
+
+    results = await async_analyzer.analyze_many_async(usernames)
+    await send_json(send, {'count': len(results), 'results': results})
+
+async def stats(receive, send):
+    await send_json(send, {
+        'cache': async_analyzer.cache.stats(),
+        'rate_limiter': async_analyzer.rate_limiter.stats(),
+        'in_flight': len(async_analyzer._in_flight),
+    })
+
+async def metrics_endpoint(receive, send):
+    body = metrics.render().encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [
+            (b'content-type', b'text/plain; version=0.0.4'),
+            (b'content-length', str(len(body)).encode('ascii')),
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+ROUTES = {
+    ('POST', '/analyze'): analyze_account,
+    ('POST', '/analyze/batch'): analyze_batch,
+    ('GET', '/stats'): stats,
+    ('GET', '/metrics'): metrics_endpoint,
+}
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await async_analyzer.aclose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    if scope['type'] != 'http':
+        return
+
+    handler = ROUTES.get((scope['method'], scope['path']))
+    if handler is None:
+        return await send_json(send, {'error': 'Not found'}, 404)
+
+    try:
+        await handler(receive, send)
+    except Exception as e:
+        await send_json(send, {'error': f'Analysis error: {str(e)}'}, 500)
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run(app, host='127.0.0.1', port=5001)
@@ -0,0 +1,101 @@
+"""
+Per-account memory of analysis result dicts versus AccountRecord and AccountStore.
+
+    python benchmarks/bench_account_store.py --accounts 1000000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from account_store import AccountRecord, AccountStore
+from risk_scoring import risk_scores
+from synthetic_data import generate_profiles
+
+def make_profiles(columns):
+    """Analysis result dicts shaped like InstagramAnalyzer.build_profile output"""
+    for i, username in enumerate(columns['username'].tolist()):
+        yield {
+            'username': username,
+            'full_name': username.replace('_', ' ').title(),
+            'is_private': bool(columns['is_private'][i]),
+            'is_verified': bool(columns['is_verified'][i]),
+            'follower_count': int(columns['follower_count'][i]),
+            'following_count': int(columns['following_count'][i]),
+            'post_count': int(columns['post_count'][i]),
+            'bio': 'x' * int(columns['bio_length'][i]),
+            'profile_pic': f'https://example.invalid/{username}.jpg',
+            'risk_score': 0,
+            'is_high_risk': False,
+            'data_source': 'REAL INSTAGRAM API',
+            'analysis_time': '2024-06-01 12:00:00',
+            'instagram_url': f'https://www.instagram.com/{username}/',
+        }
+
+def measure(build):
+    """(result, bytes still allocated by build, seconds)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, allocated, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--accounts', type=int, default=200000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    columns = generate_profiles(args.accounts, args.seed)
+
+    # Each layout is freed before the next is built: usernames are interned, so
+    # a live earlier layout would lend its strings to the next one
+    dicts, dict_bytes, _ = measure(lambda: list(make_profiles(columns)))
+    first_profile = dicts[0]
+    del dicts
+
+    records, record_bytes, _ = measure(lambda: [
+        AccountRecord(username, *fields)
+        for username, *fields in zip(
+            columns['username'].tolist(), columns['follower_count'].tolist(), columns['following_count'].tolist(),
+            columns['post_count'].tolist(), columns['bio_length'].tolist(), columns['is_verified'].tolist(),
+            columns['is_private'].tolist(),
+        )
+    ])
+    del records
+
+    def build_store():
+        store = AccountStore()
+        store.extend(
+            columns['username'].tolist(),
+            **{name: columns[name] for name in ('follower_count', 'following_count', 'post_count',
+                                                'bio_length', 'is_verified', 'is_private')},
+        )
+        return store
+    store, store_bytes, _ = measure(build_store)
+
+    start = time.perf_counter()
+    scores = store.rescore()
+    rescore_seconds = time.perf_counter() - start
+    expected = risk_scores(columns['follower_count'], columns['following_count'], columns['post_count'],
+                           columns['bio_length'], columns['is_verified'])
+    if not np.array_equal(scores, expected):
+        sys.exit('❌ AccountStore scores differ from the int64 columns')
+    if store.to_profile(0)['follower_count'] != first_profile['follower_count']:
+        sys.exit('❌ AccountStore rows differ from the profiles')
+
+    print(f"Accounts:       {args.accounts:,}")
+    for label, total in (('dict profiles', dict_bytes), ('AccountRecord', record_bytes), ('AccountStore', store_bytes)):
+        print(f"{label:<15} {total / args.accounts:>8,.1f} bytes/account   {total / 2**20:>9,.1f} MiB")
+    print(f"Reduction:      {dict_bytes / store_bytes:,.1f}x (dicts -> AccountStore)")
+    print(f"Re-score:       {args.accounts / rescore_seconds:,.0f} accounts/s")
+
+if __name__ == '__main__':
+    main()
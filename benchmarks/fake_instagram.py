@@ -0,0 +1,101 @@
+"""
+Local stand-in for Instagram's web_profile_info endpoint with configurable
+latency, error rate and 429 behaviour.
+
+    python benchmarks/fake_instagram.py --port 8765 --latency 0.2 --throttle-rate 0.05
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+PROFILE_PATH = '/api/v1/users/web_profile_info/'
+
+def fake_user(username):
+    """Deterministic user object shaped like the real API response"""
+    seed = int(hashlib.sha256(username.encode('utf-8')).hexdigest()[:12], 16)
+    return {
+        'username': username,
+        'full_name': username.replace('_', ' ').title(),
+        'is_private': seed % 3 == 0,
+        'is_verified': seed % 17 == 0,
+        'edge_followed_by': {'count': seed % 250000},
+        'edge_follow': {'count': seed % 7500},
+        'edge_owner_to_timeline_media': {'count': seed % 900},
+        'biography': '' if seed % 5 == 0 else 'Digital creator • Photography enthusiast 📸',
+        'profile_pic_url_hd': f'https://example.invalid/{username}.jpg',
+    }
+
+class FakeInstagramHandler(BaseHTTPRequestHandler):
+    # Set on the server: latency, jitter, error_rate, throttle_rate, retry_after
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        config = self.server.config
+        url = urlparse(self.path)
+        username = parse_qs(url.query).get('username', [''])[0]
+
+        time.sleep(max(0.0, config['latency'] + random.uniform(-config['jitter'], config['jitter'])))
+
+        roll = random.random()
+        if url.path != PROFILE_PATH or not username:
+            self._send(404, {'status': 'fail'})
+        elif roll < config['throttle_rate']:
+            self._send(429, {'status': 'fail', 'message': 'Please wait a few minutes'},
+                       {'Retry-After': str(config['retry_after'])})
+        elif roll < config['throttle_rate'] + config['error_rate']:
+            self._send(500, {'status': 'fail'})
+        else:
+            self._send(200, {'data': {'user': fake_user(username)}, 'status': 'ok'})
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_server(latency=0.05, jitter=0.0, error_rate=0.0, throttle_rate=0.0, retry_after=1, port=0):
+    """Serve on a background thread; returns (server, profile_api_url)"""
+    server = ThreadingHTTPServer(('127.0.0.1', port), FakeInstagramHandler)
+    server.daemon_threads = True
+    server.config = {
+        'latency': latency,
+        'jitter': jitter,
+        'error_rate': error_rate,
+        'throttle_rate': throttle_rate,
+        'retry_after': retry_after,
+    }
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}{PROFILE_PATH}'
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds per response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='+/- seconds added to latency')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of 500 responses')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='fraction of 429 responses')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds sent with 429s')
+    args = parser.parse_args()
+
+    server, url = start_server(args.latency, args.jitter, args.error_rate,
+                               args.throttle_rate, args.retry_after, args.port)
+    print(f"Fake Instagram API listening at {url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+"""
+Reproducible performance benchmarks against a local Instagram stand-in.
+
+    python benchmarks/run_benchmarks.py --requests 2000 --concurrency 32 --save baseline.json
+    python benchmarks/run_benchmarks.py --compare baseline.json --tolerance 0.2
+
+Scenarios: InstagramAnalyzer against the fake upstream, the /analyze route
+through Flask's test client, and InstagramAccountDetector.search_user on a
+synthetic multi-million-row database. Reports throughput and p50/p95/p99.
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_instagram import start_server
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def run_load(operation, items, concurrency):
+    """Run operation(item) for every item on a thread pool; returns the summary"""
+    def timed_call(item):
+        start = time.perf_counter()
+        operation(item)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = sorted(executor.map(timed_call, items))
+    elapsed = time.perf_counter() - start
+
+    return {
+        'operations': len(latencies),
+        'throughput_per_second': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+def build_synthetic_database(path, rows, seed):
+    """Create (or reuse) a seeded users/username_history database with linked accounts"""
+    if os.path.exists(path):
+        with sqlite3.connect(path) as conn:
+            if conn.execute('SELECT COUNT(*) FROM users').fetchone()[0] == rows:
+                return
+        os.remove(path)
+
+    from synthetic_data import write_sqlite
+    write_sqlite(path, rows, seed)
+
+def bench_analyzer(api_url, args):
+    from app import InstagramAnalyzer
+    from profile_cache import ProfileCache
+    from rate_limiter import RateLimiter
+
+    analyzer = InstagramAnalyzer(
+        cache=ProfileCache(max_entries=1),
+        rate_limiter=RateLimiter(args.upstream_rate, args.upstream_rate),
+        api_url=api_url,
+    )
+    # Unique usernames so every call goes upstream
+    usernames = [f'bench_{i}' for i in range(args.requests)]
+    return run_load(analyzer.get_instagram_data, usernames, args.concurrency)
+
+def bench_route(args):
+    from app import app
+
+    client = app.test_client()
+    usernames = [f'route_{i}' for i in range(args.requests)]
+    return run_load(lambda username: client.post('/analyze', json={'username': username}),
+                    usernames, args.concurrency)
+
+def bench_search_user(args):
+    from detection_engine import InstagramAccountDetector
+
+    build_synthetic_database(args.db, args.db_rows, args.seed)
+    detector = InstagramAccountDetector(args.db)
+    rng = random.Random(args.seed)
+    with sqlite3.connect(args.db) as conn:
+        usernames = [
+            conn.execute('SELECT username FROM users WHERE id = ?', (rng.randint(1, args.db_rows),)).fetchone()[0]
+            for _ in range(args.requests)
+        ]
+    return run_load(detector.search_user, usernames, args.concurrency)
+
+def compare(results, baseline, tolerance):
+    """Return a list of regressions beyond tolerance (fraction) versus the baseline"""
+    regressions = []
+    for scenario, current in results.items():
+        previous = baseline.get(scenario)
+        if not previous:
+            continue
+        if current['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{scenario}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms")
+        if current['throughput_per_second'] < previous['throughput_per_second'] * (1 - tolerance):
+            regressions.append(f"{scenario}: throughput {previous['throughput_per_second']}/s -> "
+                               f"{current['throughput_per_second']}/s")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scenarios', default='analyzer,route,search_user')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--latency', type=float, default=0.05, help='fake upstream latency in seconds')
+    parser.add_argument('--jitter', type=float, default=0.02)
+    parser.add_argument('--error-rate', type=float, default=0.01)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--upstream-rate', type=float, default=10000, help='rate limiter tokens per second')
+    parser.add_argument('--db', default=os.path.join(ROOT, 'benchmarks', 'synthetic.db'))
+    parser.add_argument('--db-rows', type=int, default=2000000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--save', help='write results to this JSON file')
+    parser.add_argument('--compare', help='baseline JSON file to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    server, api_url = start_server(args.latency, args.jitter, args.error_rate, args.throttle_rate)
+
+    # The module-level analyzer behind /analyze reads these at import time.
+    # Importing app migrates DATABASE_PATH and the route scenario records
+    # snapshots, so both go to a scratch database instead of the tracked one,
+    # and no benchmark profile reaches a persistent cache or result history.
+    scratch = tempfile.mkdtemp(prefix='instagram-bench-')
+    os.environ['PROFILE_API_URL'] = api_url
+    os.environ['UPSTREAM_RATE'] = str(args.upstream_rate)
+    os.environ['UPSTREAM_BURST'] = str(int(args.upstream_rate))
+    os.environ['DATABASE_PATH'] = os.path.join(scratch, 'instagram_data.db')
+    os.environ['IDENTITY_GRAPH_SYNC'] = '0'
+    for name in ('RESULTS_DIR', 'PROFILE_CACHE_DB', 'SHARED_CACHE_PATH'):
+        os.environ.pop(name, None)
+
+    scenarios = {
+        'analyzer': lambda: bench_analyzer(api_url, args),
+        'route': lambda: bench_route(args),
+        'search_user': lambda: bench_search_user(args),
+    }
+
+    results = {}
+    try:
+        for name in args.scenarios.split(','):
+            results[name] = scenarios[name]()
+            r = results[name]
+            print(f"{name:<12} {r['throughput_per_second']:>10,.1f}/s   "
+                  f"p50 {r['p50_ms']:>9.3f}ms   p95 {r['p95_ms']:>9.3f}ms   p99 {r['p99_ms']:>9.3f}ms")
+    finally:
+        server.shutdown()
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("❌ Performance regressions:")
+            for regression in regressions:
+                print(f"   - {regression}")
+            sys.exit(1)
+        print("✅ No performance regressions")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+"""
+Stream CSV or JSONL exports of accounts and username changes into the database.
+
+    python bulk_load.py --users accounts.csv --history renames.jsonl
+
+Account rows need username, email and phone (created_at is optional).
+Username change rows need old_username and new_username plus either the
+user_id or the account's current username (changed_at is optional).
+"""
+import argparse
+import csv
+import json
+import sqlite3
+import time
+from itertools import islice
+
+from migrations import BUMP_GENERATION, GENERATION_TRIGGERS, INDEXES, migrate
+
+DEFAULT_CHUNK_SIZE = 50000
+
+# Trade durability for speed while loading; restored afterwards
+LOAD_PRAGMAS = {
+    'synchronous': 'OFF',
+    'temp_store': 'MEMORY',
+    'cache_size': '-262144',  # 256 MB
+}
+
+UPSERT_USER = '''
+    INSERT INTO users (username, email, phone, created_at)
+    VALUES (?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+    ON CONFLICT (username) DO UPDATE SET email = excluded.email, phone = excluded.phone
+'''
+
+STAGE_HISTORY = '''
+    INSERT INTO staged_history (user_id, username, old_username, new_username, changed_at)
+    VALUES (?, ?, ?, ?, ?)
+'''
+
+# Resolve accounts referenced by username in one set-based pass
+MERGE_HISTORY = '''
+    INSERT INTO username_history (user_id, old_username, new_username, changed_at)
+    SELECT COALESCE(s.user_id, u.id), s.old_username, s.new_username,
+           COALESCE(s.changed_at, CURRENT_TIMESTAMP)
+    FROM staged_history s
+    LEFT JOIN users u ON s.user_id IS NULL AND u.username = s.username
+    WHERE COALESCE(s.user_id, u.id) IS NOT NULL
+'''
+
+def read_records(path):
+    """Yield one dict per row of a CSV or JSONL file"""
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.endswith(('.jsonl', '.ndjson')):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(f)
+
+def user_rows(records):
+    for record in records:
+        yield (
+            record['username'],
+            record.get('email') or None,
+            record.get('phone') or None,
+            record.get('created_at') or None,
+        )
+
+def history_rows(records):
+    for record in records:
+        user_id = record.get('user_id')
+        yield (
+            int(user_id) if user_id not in (None, '') else None,
+            record.get('username') or None,
+            record['old_username'],
+            record['new_username'],
+            record.get('changed_at') or None,
+        )
+
+def chunked(rows, size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+def load_chunks(conn, statement, rows, chunk_size):
+    """executemany in one transaction per chunk; returns the number of rows written"""
+    total = 0
+    for chunk in chunked(rows, chunk_size):
+        conn.execute('BEGIN')
+        conn.executemany(statement, chunk)
+        conn.commit()
+        total += len(chunk)
+    return total
+
+class BulkLoader:
+    def __init__(self, db_path='instagram_data.db', chunk_size=DEFAULT_CHUNK_SIZE):
+        self.db_path = db_path
+        self.chunk_size = chunk_size
+
+    def load(self, users_path=None, history_path=None):
+        """Load the given files and return {'users': n, 'history': n, 'seconds': s}"""
+        conn = sqlite3.connect(self.db_path)
+        migrate(conn)
+        saved = {name: conn.execute(f'PRAGMA {name}').fetchone()[0] for name in LOAD_PRAGMAS}
+        stats = {'users': 0, 'history': 0}
+        start = time.perf_counter()
+
+        try:
+            for name, value in LOAD_PRAGMAS.items():
+                conn.execute(f'PRAGMA {name} = {value}')
+
+            # Build secondary indexes once at the end instead of per row, and
+            # bump the data generation once instead of from a trigger per row
+            for index in INDEXES:
+                conn.execute(f'DROP INDEX IF EXISTS {index}')
+            for trigger in GENERATION_TRIGGERS:
+                conn.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+
+            if users_path:
+                stats['users'] = load_chunks(conn, UPSERT_USER, user_rows(read_records(users_path)), self.chunk_size)
+
+            if history_path:
+                conn.execute('''
+                    CREATE TEMP TABLE staged_history (
+                        user_id INTEGER, username TEXT,
+                        old_username TEXT, new_username TEXT, changed_at TIMESTAMP
+                    )
+                ''')
+                load_chunks(conn, STAGE_HISTORY, history_rows(read_records(history_path)), self.chunk_size)
+                conn.execute('BEGIN')
+                stats['history'] = conn.execute(MERGE_HISTORY).rowcount
+                conn.execute('DROP TABLE staged_history')
+                conn.commit()
+        finally:
+            conn.rollback()
+            for statement in INDEXES.values():
+                conn.execute(statement)
+            for statement in GENERATION_TRIGGERS.values():
+                conn.execute(statement)
+            conn.execute(BUMP_GENERATION)
+            conn.execute('ANALYZE')
+            conn.commit()
+            for name, value in saved.items():
+                conn.execute(f'PRAGMA {name} = {value}')
+            conn.close()
+
+        stats['seconds'] = time.perf_counter() - start
+        return stats
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', help='CSV/JSONL file of accounts')
+    parser.add_argument('--history', help='CSV/JSONL file of username changes')
+    parser.add_argument('--db', default='instagram_data.db')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    if not args.users and not args.history:
+        parser.error('nothing to load: pass --users and/or --history')
+
+    stats = BulkLoader(args.db, args.chunk_size).load(args.users, args.history)
+    rows = stats['users'] + stats['history']
+    rate = rows / stats['seconds'] if stats['seconds'] else 0
+
+    print("✅ Bulk load completed successfully!")
+    print(f"   - {stats['users']:,} user accounts")
+    print(f"   - {stats['history']:,} username change records")
+    print(f"   - {stats['seconds']:.1f}s ({rate:,.0f} rows/sec)")
+
+if __name__ == "__main__":
+    main()
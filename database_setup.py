@@ -1,32 +1,13 @@
 import sqlite3
 import hashlib
+from migrations import migrate
 
 def setup_database():
     conn = sqlite3.connect('instagram_data.db')
     cursor = conn.cursor()
     
-    # Create users table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE,
-            email TEXT,
-            phone TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    # Create username_history table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS username_history (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER,
-            old_username TEXT,
-            new_username TEXT,
-            changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users (id)
-        )
-    ''')
+    # Create or upgrade the schema
+    migrate(conn)
     
     # Insert sample data
     sample_data = [
@@ -47,20 +28,14 @@ def setup_database():
         (3, 'mike_original', 'mike_jones'),
     ]
     
-    for username, email, phone in sample_data:
-        try:
-            cursor.execute(
-                'INSERT OR IGNORE INTO users (username, email, phone) VALUES (?, ?, ?)',
-                (username, email, phone)
-            )
-        except:
-            pass
-    
-    for user_id, old_username, new_username in username_changes:
-        cursor.execute(
-            'INSERT INTO username_history (user_id, old_username, new_username) VALUES (?, ?, ?)',
-            (user_id, old_username, new_username)
-        )
+    cursor.executemany(
+        'INSERT OR IGNORE INTO users (username, email, phone) VALUES (?, ?, ?)',
+        sample_data
+    )
+    cursor.executemany(
+        'INSERT INTO username_history (user_id, old_username, new_username) VALUES (?, ?, ?)',
+        username_changes
+    )
     
     conn.commit()
     conn.close()
@@ -1,91 +1,187 @@
 import sqlite3
+import threading
+
+from metrics import timed
+from rename_velocity import WINDOWS, is_burst, rolling_counts
+
+# Linked accounts (including this one) at which a cluster counts as a ring
+SUSPICIOUS_CLUSTER_SIZE = 3
+
+# suspicion_score thresholds: flagged as suspicious, and so clear-cut that
+# no profile data could change the verdict
+SUSPICIOUS_SCORE = 2
+CONCLUSIVE_SCORE = 4
+
+# Look-alikes at this skeleton distance are the same handle disguised
+# (separators, homoglyphs, appended number), i.e. likely impersonation
+IMPERSONATION_DISTANCE = 0
+
+# One round trip returns the user row, every account sharing its email or
+# phone, its username history and its peak rename counts per sliding window.
+# The first column tags each row's kind.
+LINKED_ACCOUNTS_QUERY = f'''
+    WITH target AS (
+        SELECT id, username, email, phone
+        FROM users
+        WHERE username = ?
+    ),
+    history AS (
+        SELECT h.old_username, h.new_username, h.changed_at,
+               {rolling_counts('julianday(h.changed_at)')}
+        FROM target t JOIN username_history h ON h.user_id = t.id
+    )
+    SELECT 0 AS kind, id, username, email, phone
+    FROM target
+    UNION ALL
+    SELECT 1, NULL, u.username, NULL, NULL
+    FROM target t JOIN users u ON u.email = t.email AND u.username != t.username
+    UNION ALL
+    SELECT 2, NULL, u.username, NULL, NULL
+    FROM target t JOIN users u ON u.phone = t.phone AND u.username != t.username
+    UNION ALL
+    SELECT 3, NULL, old_username, new_username, changed_at
+    FROM history
+    UNION ALL
+    SELECT 4, NULL, peak_24h, peak_7d, peak_30d
+    FROM (SELECT MAX(in_24h) AS peak_24h, MAX(in_7d) AS peak_7d, MAX(in_30d) AS peak_30d FROM history)
+    -- An aggregate always yields one row; drop it for accounts with no renames
+    WHERE peak_24h IS NOT NULL
+    ORDER BY kind, phone
+'''
 
 class InstagramAccountDetector:
-    def __init__(self, db_path="instagram_data.db"):
+    def __init__(self, db_path="instagram_data.db", identity_graph=None, cache=None, lookalike_index=None):
         self.db_path = db_path
+        self.identity_graph = identity_graph
+        # Optional LookalikeIndex: adds accounts with near-identical handles
+        self.lookalike_index = lookalike_index
+        # Optional SharedCache: lookups are shared by every worker process on the host
+        self.cache = cache
+        self._local = threading.local()
+    
+    def _connection(self):
+        """Persistent connection for the calling thread"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path)
+            # WAL lets readers on other threads proceed while a writer is active
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+    
+    def close(self):
+        """Close the calling thread's connection"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+    
+    def _generation(self, conn):
+        """
+        Current data_generation, or None on a database without it. The row is
+        only re-read after another connection has committed (data_version moved)
+        """
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        cached = getattr(self._local, "generation", None)
+        if cached is None or cached[0] != version:
+            try:
+                row = conn.execute("SELECT generation FROM data_generation WHERE id = 1").fetchone()
+            except sqlite3.OperationalError:
+                row = None
+            cached = (version, row[0] if row else None)
+            self._local.generation = cached
+        return cached[1]
     
     def search_user(self, username):
         """Search for a user by username and return detailed information"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         try:
-            # Get user basic info
-            cursor.execute('''
-                SELECT id, username, email, phone 
-                FROM users 
-                WHERE username = ?
-            ''', (username,))
-            
-            user_data = cursor.fetchone()
-            
-            if not user_data:
-                return {"error": f"User '{username}' not found in database"}
-            
-            user_id, current_username, email, phone = user_data
-            
-            # Get username change count
-            cursor.execute('''
-                SELECT COUNT(*) 
-                FROM username_history 
-                WHERE user_id = ?
-            ''', (user_id,))
-            
-            username_change_count = cursor.fetchone()[0]
-            
-            # Find other accounts with same email
-            cursor.execute('''
-                SELECT username 
-                FROM users 
-                WHERE email = ? AND username != ?
-            ''', (email, username))
-            
-            same_email_accounts = [row[0] for row in cursor.fetchall()]
-            
-            # Find other accounts with same phone
-            cursor.execute('''
-                SELECT username 
-                FROM users 
-                WHERE phone = ? AND username != ?
-            ''', (phone, username))
-            
-            same_phone_accounts = [row[0] for row in cursor.fetchall()]
-            
-            # Get username change history
-            cursor.execute('''
-                SELECT old_username, new_username, changed_at 
-                FROM username_history 
-                WHERE user_id = ? 
-                ORDER BY changed_at
-            ''', (user_id,))
-            
-            username_history = cursor.fetchall()
-            
-            conn.close()
-            
-            return {
-                "success": True,
-                "current_username": current_username,
-                "email": email,
-                "phone": phone,
-                "username_change_count": username_change_count,
-                "same_email_accounts": same_email_accounts,
-                "same_phone_accounts": same_phone_accounts,
-                "username_history": username_history,
-                "total_linked_accounts": len(same_email_accounts) + len(same_phone_accounts) + 1
-            }
+            conn = self._connection()
+            # Keyed by generation: any users/username_history change starts a fresh keyspace
+            generation = self._generation(conn) if self.cache is not None else None
+            cache_key = f"{generation}:{username}"
+            result = self.cache.get("search_user", cache_key) if generation is not None else None
+            
+            if result is not None and "username_history" in result:
+                # JSON has no tuples
+                result["username_history"] = [tuple(change) for change in result["username_history"]]
+            elif result is None:
+                result = self._lookup(conn, username)
+                if generation is not None:
+                    self.cache.set("search_user", cache_key, result)
+            
+            if self.identity_graph is not None and "error" not in result:
+                current_username = result["current_username"]
+                cluster = self.identity_graph.cluster(current_username)
+                result["cluster_accounts"] = [name for name in cluster if name != current_username]
+                result["cluster_size"] = len(cluster)
+            
+            if self.lookalike_index is not None:
+                current_username = result.get("current_username", username)
+                result["lookalike_accounts"] = [
+                    match for match in self.lookalike_index.search(username)
+                    if match["username"] != current_username
+                ]
+            
+            return result
             
         except Exception as e:
-            conn.close()
             return {"error": f"Database error: {str(e)}"}
     
-    def is_suspicious(self, user_info):
-        """Determine if account is suspicious based on patterns"""
-        if "error" in user_info:
-            return False
-            
+    def _lookup(self, conn, username):
+        with timed("search_user_sql"):
+            rows = conn.execute(LINKED_ACCOUNTS_QUERY, (username,)).fetchall()
+        
+        if not rows:
+            return {"error": f"User '{username}' not found in database"}
+        
+        _, user_id, current_username, email, phone = rows[0]
+        same_email_accounts = []
+        same_phone_accounts = []
+        username_history = []
+        rename_velocity = dict.fromkeys(WINDOWS, 0)
+        
+        for kind, _, first, second, third in rows[1:]:
+            if kind == 1:
+                same_email_accounts.append(first)
+            elif kind == 2:
+                same_phone_accounts.append(first)
+            elif kind == 3:
+                username_history.append((first, second, third))
+            else:
+                rename_velocity = dict(zip(WINDOWS, (first, second, third)))
+        
+        return {
+            "success": True,
+            "user_id": user_id,
+            "current_username": current_username,
+            "email": email,
+            "phone": phone,
+            "username_change_count": len(username_history),
+            "same_email_accounts": same_email_accounts,
+            "same_phone_accounts": same_phone_accounts,
+            "username_history": username_history,
+            "rename_velocity": rename_velocity,
+            "rename_burst": is_burst(rename_velocity),
+            "total_linked_accounts": len(same_email_accounts) + len(same_phone_accounts) + 1
+        }
+    
+    def suspicion_score(self, user_info):
+        """Points of linked-account evidence against an account"""
         suspicious_score = 0
         
+        # Disguised copy of an older account's handle; applies to unknown accounts
+        # too. The original is never penalized for the copies made of it.
+        user_id = user_info.get("user_id")
+        if any(
+            match["distance"] <= IMPERSONATION_DISTANCE
+            and ("error" in user_info or (user_id is not None and match["user_id"] < user_id))
+            for match in user_info.get("lookalike_accounts", [])
+        ):
+            suspicious_score += 2
+        
+        if "error" in user_info:
+            return suspicious_score
+        
         # Multiple accounts with same email
         if len(user_info["same_email_accounts"]) >= 2:
             suspicious_score += 2
@@ -94,8 +190,23 @@ class InstagramAccountDetector:
         if len(user_info["same_phone_accounts"]) >= 2:
             suspicious_score += 2
             
+        # Burst renaming: many renames inside one sliding window
+        if is_burst(user_info.get("rename_velocity", {})):
+            suspicious_score += 2
         # Frequent username changes
-        if user_info["username_change_count"] >= 3:
+        elif user_info["username_change_count"] >= 3:
             suspicious_score += 1
+        
+        # Part of a ring linked through chained shared identifiers. Direct
+        # email/phone matches already scored above, so only a cluster that
+        # reaches further than them counts
+        direct = set(user_info["same_email_accounts"]) | set(user_info["same_phone_accounts"])
+        indirect = set(user_info.get("cluster_accounts", [])) - direct
+        if user_info.get("cluster_size", 0) >= SUSPICIOUS_CLUSTER_SIZE and indirect:
+            suspicious_score += 2
             
-        return suspicious_score >= 2
\ No newline at end of file
+        return suspicious_score
+    
+    def is_suspicious(self, user_info):
+        """Determine if account is suspicious based on patterns"""
+        return self.suspicion_score(user_info) >= SUSPICIOUS_SCORE
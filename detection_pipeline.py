@@ -0,0 +1,59 @@
+from detection_engine import CONCLUSIVE_SCORE, SUSPICIOUS_SCORE
+from metrics import timed
+from rate_limiter import INTERACTIVE
+
+# Risk points added to the profile's 0-100 risk score per point of database suspicion
+DATABASE_POINT_RISK = 15
+FAKE_RISK = 70
+SUSPICIOUS_RISK = 40
+
+class DetectionPipeline:
+    """
+    One verdict from both evidence sources: the linked-account lookup runs
+    first (about a millisecond), and the upstream profile is fetched only
+    when the database result is not already conclusive.
+    """
+
+    def __init__(self, analyzer, detector):
+        self.analyzer = analyzer
+        self.detector = detector
+
+    def detect(self, username):
+        with timed('detect_database'):
+            user_info = self.detector.search_user(username)
+            database_score = self.detector.suspicion_score(user_info)
+
+        if database_score >= CONCLUSIVE_SCORE:
+            return self.verdict(username, user_info, database_score, None)
+
+        profile = self.analyzer.get_instagram_data(username, INTERACTIVE)
+        return self.verdict(username, user_info, database_score, profile)
+
+    def verdict(self, username, user_info, database_score, profile):
+        """Merge both sources into one decision"""
+        conclusive = database_score >= CONCLUSIVE_SCORE
+        if profile is None:
+            risk_score = 100
+        else:
+            risk_score = min(100, profile['risk_score'] + DATABASE_POINT_RISK * database_score)
+
+        if conclusive or risk_score > FAKE_RISK:
+            verdict = 'fake'
+        elif risk_score > SUSPICIOUS_RISK or database_score >= SUSPICIOUS_SCORE:
+            verdict = 'suspicious'
+        else:
+            verdict = 'genuine'
+
+        return {
+            'username': username,
+            'verdict': verdict,
+            'risk_score': risk_score,
+            'short_circuited': profile is None,
+            'database': {
+                'found': 'error' not in user_info,
+                'suspicion_score': database_score,
+                'is_suspicious': self.detector.is_suspicious(user_info),
+                **user_info,
+            },
+            'profile': profile,
+        }
@@ -0,0 +1,193 @@
+"""
+Clusters of accounts linked through shared emails or phones, stored next to
+the data so every worker process reads the same clusters without building
+them in memory.
+
+    python identity_graph.py --db instagram_data.db            # build or catch up
+    python identity_graph.py --db instagram_data.db --rebuild
+"""
+import argparse
+import sqlite3
+import threading
+import time
+
+from migrations import migrate
+
+SYNC_CHUNK_SIZE = 5000  # accounts folded in per write transaction
+
+# Any one already-synced account sharing the identifier is enough: all of
+# them are in the same cluster already
+LINKED_ROOT_QUERIES = [
+    f'''
+    SELECT c.root FROM users u JOIN identity_components c ON c.user_id = u.id
+    WHERE u.{column} = ? LIMIT 1
+    '''
+    for column in ('email', 'phone')
+]
+
+CLUSTER_QUERY = '''
+    SELECT member.username
+    FROM users u
+    JOIN identity_components c ON c.user_id = u.id
+    JOIN identity_components peer ON peer.root = c.root
+    JOIN users member ON member.id = peer.user_id
+    WHERE u.username = ?
+    ORDER BY member.id
+'''
+
+class IdentityGraph:
+    """
+    Connected components of accounts linked through shared emails or phones,
+    kept as a union-find in identity_components/identity_clusters so a whole
+    ring is one indexed query. Usernames never link two accounts: a released
+    handle can be registered by someone unrelated.
+
+    sync() folds in accounts added since the last sync and is safe to run
+    from several processes. Components only ever merge; call rebuild() after
+    rows are deleted or an account's email/phone is changed.
+    """
+
+    def __init__(self, db_path="instagram_data.db"):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._stopping = threading.Event()
+        self._thread = None
+        migrate(self._connection())
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def cluster(self, username):
+        """Current usernames of every account in the same component (including this one)"""
+        return [row[0] for row in self._connection().execute(CLUSTER_QUERY, (username,))]
+
+    def cluster_size(self, username):
+        row = self._connection().execute('''
+            SELECT s.size
+            FROM users u
+            JOIN identity_components c ON c.user_id = u.id
+            JOIN identity_clusters s ON s.root = c.root
+            WHERE u.username = ?
+        ''', (username,)).fetchone()
+        return row[0] if row else 0
+
+    def sync(self, chunk_size=SYNC_CHUNK_SIZE):
+        """Fold in accounts added since the last sync; returns how many"""
+        conn = self._connection()
+        synced = 0
+        while True:
+            # IMMEDIATE so two processes never fold in the same accounts
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = conn.execute("SELECT last_id FROM identity_state WHERE name = 'users'").fetchone()
+                users = conn.execute(
+                    'SELECT id, email, phone FROM users WHERE id > ? ORDER BY id LIMIT ?',
+                    (row[0] if row else 0, chunk_size)
+                ).fetchall()
+                for user_id, email, phone in users:
+                    self._add_user(conn, user_id, email, phone)
+                if users:
+                    conn.execute("INSERT OR REPLACE INTO identity_state (name, last_id) VALUES ('users', ?)",
+                                 (users[-1][0],))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            synced += len(users)
+            if len(users) < chunk_size:
+                return synced
+
+    def rebuild(self, chunk_size=SYNC_CHUNK_SIZE):
+        """Recompute every component from scratch"""
+        conn = self._connection()
+        conn.execute('DELETE FROM identity_components')
+        conn.execute('DELETE FROM identity_clusters')
+        conn.execute('DELETE FROM identity_state')
+        conn.commit()
+        return self.sync(chunk_size)
+
+    def start(self, interval):
+        """Sync now and then every `interval` seconds on a daemon thread (idempotent)"""
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._sync_forever, args=(interval,),
+                                        name="identity-graph-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _sync_forever(self, interval):
+        while True:
+            try:
+                self.sync()
+            except sqlite3.Error:
+                # Database busy or not created yet; the next round catches up
+                pass
+            if self._stopping.wait(interval):
+                return
+
+    def stats(self):
+        accounts, = self._connection().execute('SELECT COUNT(*) FROM identity_components').fetchone()
+        clusters, largest = self._connection().execute(
+            'SELECT COUNT(*), COALESCE(MAX(size), 0) FROM identity_clusters'
+        ).fetchone()
+        return {
+            'accounts': accounts,
+            'clusters': clusters,
+            'largest_cluster': largest,
+        }
+
+    # Callers below hold the write transaction
+
+    def _add_user(self, conn, user_id, email, phone):
+        roots = {user_id}
+        for query, identifier in zip(LINKED_ROOT_QUERIES, (email, phone)):
+            if identifier:
+                row = conn.execute(query, (identifier,)).fetchone()
+                if row:
+                    roots.add(row[0])
+
+        conn.execute('INSERT INTO identity_components (user_id, root) VALUES (?, ?)', (user_id, user_id))
+        conn.execute('INSERT INTO identity_clusters (root, size) VALUES (?, 1)', (user_id,))
+        if len(roots) > 1:
+            self._union(conn, roots)
+
+    def _union(self, conn, roots):
+        sizes = dict(conn.execute(
+            f'SELECT root, size FROM identity_clusters WHERE root IN ({",".join("?" * len(roots))})',
+            list(roots)
+        ))
+        # Union by size: the smaller clusters are relabelled into the largest
+        largest = max(sizes, key=sizes.get)
+        for root, size in sizes.items():
+            if root == largest:
+                continue
+            conn.execute('UPDATE identity_components SET root = ? WHERE root = ?', (largest, root))
+            conn.execute('DELETE FROM identity_clusters WHERE root = ?', (root,))
+        conn.execute('UPDATE identity_clusters SET size = ? WHERE root = ?', (sum(sizes.values()), largest))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--db', default='instagram_data.db')
+    parser.add_argument('--rebuild', action='store_true', help='drop the clusters and build them from scratch')
+    args = parser.parse_args()
+
+    graph = IdentityGraph(args.db)
+    start = time.perf_counter()
+    synced = graph.rebuild() if args.rebuild else graph.sync()
+    stats = graph.stats()
+    print(f"✅ Clustered {synced:,} new accounts in {time.perf_counter() - start:.1f}s")
+    print(f"   - {stats['clusters']:,} clusters, largest {stats['largest_cluster']:,} accounts")
+
+if __name__ == '__main__':
+    main()
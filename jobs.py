@@ -0,0 +1,212 @@
+import json
+import sqlite3
+import threading
+
+from migrations import migrate
+
+CLAIM_SIZE = 8        # items a worker takes per database round trip
+IDLE_POLL_SECONDS = 1.0
+# A claimed item is leased to its worker; the lease is renewed as each of the
+# worker's items finishes, and an item whose lease lapsed (its process died)
+# goes back to pending. Well above the slowest single analysis.
+LEASE_SECONDS = 600
+
+CLAIMABLE_QUERY = f'''
+    SELECT EXISTS (SELECT 1 FROM scan_job_items WHERE status = 'pending')
+        OR EXISTS (SELECT 1 FROM scan_job_items
+                   WHERE status = 'running' AND updated_at < datetime('now', '-{LEASE_SECONDS} seconds'))
+'''
+
+class JobQueue:
+    """
+    Persistent queue of bulk scans. Jobs and per-username state live in SQLite,
+    so a restarted process picks up where the previous one stopped.
+    """
+
+    def __init__(self, db_path, analyzer, workers=8):
+        self.db_path = db_path
+        self.analyzer = analyzer
+        self.workers = workers
+        self._local = threading.local()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads = []
+        self._start_lock = threading.Lock()
+        migrate(self._connection())
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def start(self):
+        """
+        Start the worker pool (idempotent). Items interrupted by a crash are
+        resumed once their lease expires, so other live processes are never
+        robbed of the items they are running.
+        """
+        with self._start_lock:
+            if self._threads:
+                return
+            self._stopping.clear()
+            for n in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"scan-worker-{n}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self):
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def create_job(self, usernames):
+        """Persist a new scan and return its id"""
+        usernames = [username.strip() for username in usernames if isinstance(username, str) and username.strip()]
+        conn = self._connection()
+        try:
+            job_id = conn.execute('INSERT INTO scan_jobs (total) VALUES (?)', (len(usernames),)).lastrowid
+            conn.executemany(
+                'INSERT INTO scan_job_items (job_id, position, username) VALUES (?, ?, ?)',
+                ((job_id, position, username) for position, username in enumerate(usernames))
+            )
+            if not usernames:
+                conn.execute("UPDATE scan_jobs SET status = 'completed' WHERE id = ?", (job_id,))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        self._wakeup.set()
+        return job_id
+
+    def cancel(self, job_id):
+        conn = self._connection()
+        conn.execute("UPDATE scan_job_items SET status = 'cancelled' WHERE job_id = ? AND status = 'pending'", (job_id,))
+        conn.execute('''
+            UPDATE scan_jobs SET status = 'cancelled', updated_at = CURRENT_TIMESTAMP
+            WHERE id = ? AND status IN ('pending', 'running')
+        ''', (job_id,))
+        conn.commit()
+
+    def progress(self, job_id):
+        """Job status with per-state item counts, or None for an unknown job"""
+        conn = self._connection()
+        job = conn.execute(
+            'SELECT id, status, total, created_at, updated_at FROM scan_jobs WHERE id = ?', (job_id,)
+        ).fetchone()
+        if job is None:
+            return None
+
+        counts = {'pending': 0, 'running': 0, 'done': 0, 'failed': 0, 'cancelled': 0}
+        for status, count in conn.execute(
+            'SELECT status, COUNT(*) FROM scan_job_items WHERE job_id = ? GROUP BY status', (job_id,)
+        ):
+            counts[status] = count
+
+        finished = counts['done'] + counts['failed']
+        return {
+            'job_id': job[0],
+            'status': job[1],
+            'total': job[2],
+            'created_at': job[3],
+            'updated_at': job[4],
+            'counts': counts,
+            'percent_complete': round(100 * finished / job[2], 1) if job[2] else 100.0,
+        }
+
+    def results(self, job_id, offset=0, limit=100):
+        """Finished items (done or failed) in input order, available while the job runs"""
+        rows = self._connection().execute('''
+            SELECT position, username, status, result
+            FROM scan_job_items
+            WHERE job_id = ? AND status IN ('done', 'failed')
+            ORDER BY position
+            LIMIT ? OFFSET ?
+        ''', (job_id, limit, offset)).fetchall()
+        return [
+            {'index': position, 'username': username, 'status': status, **json.loads(result)}
+            for position, username, status, result in rows
+        ]
+
+    def _claim(self):
+        conn = self._connection()
+        # Idle workers poll with a plain read so they never take the write lock for nothing
+        if not conn.execute(CLAIMABLE_QUERY).fetchone()[0]:
+            return []
+        # IMMEDIATE takes the write lock up front so two workers never claim the same rows
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute(f'''
+                UPDATE scan_job_items SET status = 'pending'
+                WHERE status = 'running' AND updated_at < datetime('now', '-{LEASE_SECONDS} seconds')
+            ''')
+            items = conn.execute('''
+                SELECT job_id, position, username
+                FROM scan_job_items
+                WHERE status = 'pending'
+                ORDER BY job_id, position
+                LIMIT ?
+            ''', (CLAIM_SIZE,)).fetchall()
+            conn.executemany(
+                "UPDATE scan_job_items SET status = 'running', updated_at = CURRENT_TIMESTAMP WHERE job_id = ? AND position = ?",
+                [(job_id, position) for job_id, position, _ in items]
+            )
+            conn.executemany(
+                "UPDATE scan_jobs SET status = 'running', updated_at = CURRENT_TIMESTAMP WHERE id = ? AND status = 'pending'",
+                {(job_id,) for job_id, _, _ in items}
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return items
+
+    def _finish(self, job_id, position, outcome, remaining=()):
+        """Store an item's outcome and renew the lease on the worker's remaining items"""
+        status = 'failed' if outcome['status'] == 'error' else 'done'
+        payload = {key: value for key, value in outcome.items() if key not in ('username', 'status')}
+        conn = self._connection()
+        try:
+            conn.execute('''
+                UPDATE scan_job_items SET status = ?, result = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE job_id = ? AND position = ?
+            ''', (status, json.dumps(payload), job_id, position))
+            conn.executemany(
+                "UPDATE scan_job_items SET updated_at = CURRENT_TIMESTAMP WHERE job_id = ? AND position = ? AND status = 'running'",
+                [(item_job_id, item_position) for item_job_id, item_position, _ in remaining]
+            )
+            conn.execute('''
+                UPDATE scan_jobs SET status = 'completed', updated_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND status = 'running' AND NOT EXISTS (
+                    SELECT 1 FROM scan_job_items WHERE job_id = ? AND status IN ('pending', 'running')
+                )
+            ''', (job_id, job_id))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    def _work(self):
+        while not self._stopping.is_set():
+            try:
+                items = self._claim()
+            except sqlite3.OperationalError:
+                # Database busy for longer than the connection timeout; try again later
+                items = []
+            if not items:
+                self._wakeup.wait(IDLE_POLL_SECONDS)
+                self._wakeup.clear()
+                continue
+
+            for index, (job_id, position, username) in enumerate(items):
+                outcome = self.analyzer.analyze_one(username)
+                try:
+                    self._finish(job_id, position, outcome, items[index + 1:])
+                except sqlite3.OperationalError:
+                    # Database busy; the item stays running and is re-queued when its lease expires
+                    pass
@@ -0,0 +1,253 @@
+"""
+Fuzzy look-alike search over every current and past username, for spotting
+impersonators (swapped '_'/'.', appended digits, homoglyphs, one-letter typos).
+
+    python lookalike_index.py --db instagram_data.db                 # build or catch up
+    python lookalike_index.py --db instagram_data.db --query harini.kannan_l8
+
+Handles are reduced to a skeleton (case-folded, separators dropped, confusable
+characters mapped to one letter) and indexed SymSpell-style: every skeleton
+and each of its single-character deletes is stored as a hashed variant. Two
+handles within one edit of each other share a variant, so a lookup is one
+indexed IN query plus an exact distance check on a handful of candidates.
+"""
+import argparse
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from itertools import islice
+
+from metrics import timed
+from migrations import migrate
+
+MAX_DISTANCE = 1           # edits allowed between skeletons
+MIN_DELETE_LENGTH = 5      # shorter skeletons are only matched exactly
+MIN_STRIPPED_LENGTH = 5    # 'jo_123' -> 'jo' is too short to mean anything
+MAX_CANDIDATES = 2000      # accounts checked per lookup
+DEFAULT_CHUNK_SIZE = 50000
+SQL_VARIABLES = 900
+
+SEPARATORS = re.compile(r'[\s._\-]+')
+TRAILING_DIGITS = re.compile(r'\d+$')
+
+# Characters that render alike, mapped to one representative
+CONFUSABLES = str.maketrans({
+    '0': 'o', '1': 'l', 'i': 'l', '|': 'l', '!': 'l', '3': 'e', '4': 'a', '5': 's', '7': 't', '$': 's', '@': 'a',
+    # Cyrillic and Greek letters that look Latin
+    'а': 'a', 'е': 'e', 'о': 'o', 'р': 'p', 'с': 'c', 'у': 'y', 'х': 'x', 'к': 'k', 'м': 'm', 'т': 't',
+    'в': 'b', 'н': 'h', 'і': 'l', 'ј': 'j', 'ѕ': 's', 'ԁ': 'd', 'ɡ': 'g',
+    'α': 'a', 'ο': 'o', 'ρ': 'p', 'ν': 'v', 'τ': 't', 'ι': 'l', 'κ': 'k', 'χ': 'x', 'ε': 'e', 'υ': 'u',
+})
+# Letter pairs that read as one letter
+DIGRAPHS = (('rn', 'm'), ('vv', 'w'), ('cl', 'd'))
+
+def skeleton(handle):
+    """Canonical form two visually confusable handles share"""
+    text = SEPARATORS.sub('', unicodedata.normalize('NFKC', handle).casefold())
+    return _confusables(text)
+
+def _confusables(text):
+    text = text.translate(CONFUSABLES)
+    for pair, letter in DIGRAPHS:
+        text = text.replace(pair, letter)
+    return text
+
+def query_keys(handle):
+    """
+    Skeletons a queried handle is looked up under: as written, and without a
+    trailing number so 'cristiano_2024' finds 'cristiano'. Only the first is
+    indexed, or every 'john_<n>' would match every other one.
+    """
+    text = SEPARATORS.sub('', unicodedata.normalize('NFKC', handle).casefold())
+    keys = {_confusables(text)}
+    stripped = TRAILING_DIGITS.sub('', text)
+    if stripped != text and len(stripped) >= MIN_STRIPPED_LENGTH:
+        keys.add(_confusables(stripped))
+    keys.discard('')
+    return keys
+
+def _hash(text):
+    # 8-byte hashes keep the table narrow; a collision only adds a candidate
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'big', signed=True)
+
+def variants(keys):
+    """Hashed SymSpell variants: each key and, for longer keys, its single deletes"""
+    hashes = set()
+    for key in keys:
+        hashes.add(_hash(key))
+        if len(key) >= MIN_DELETE_LENGTH:
+            hashes.update(_hash(key[:i] + key[i + 1:]) for i in range(len(key)))
+    return hashes
+
+def edit_distance(a, b, limit=MAX_DISTANCE):
+    """Optimal string alignment distance, or limit + 1 once it is known to exceed limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if previous2 is not None and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+def _chunks(items, size):
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+class LookalikeIndex:
+    """
+    Persistent look-alike index over users.username and username_history,
+    stored next to the data it covers. sync() folds in rows added since the
+    last run; call rebuild() after rows are deleted.
+    """
+
+    def __init__(self, db_path="instagram_data.db"):
+        self.db_path = db_path
+        self._local = threading.local()
+        migrate(self._connection())
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def sync(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Index accounts and username changes added since the last sync"""
+        conn = self._connection()
+        last = dict(conn.execute('SELECT name, last_id FROM lookalike_state'))
+        stats = {'users': 0, 'history': 0}
+
+        sources = {
+            'users': 'SELECT id, id, username, NULL FROM users WHERE id > ? ORDER BY id',
+            'history': 'SELECT id, user_id, old_username, new_username FROM username_history WHERE id > ? ORDER BY id',
+        }
+        for name, query in sources.items():
+            # A separate read connection so the writes below can commit mid-scan
+            reader = sqlite3.connect(self.db_path)
+            try:
+                for rows in _chunks(reader.execute(query, (last.get(name, 0),)), chunk_size):
+                    entries = {
+                        (variant, user_id)
+                        for _, user_id, first, second in rows
+                        for handle in (first, second) if handle
+                        for variant in variants([skeleton(handle)])
+                    }
+                    conn.execute('BEGIN')
+                    conn.executemany('INSERT OR IGNORE INTO lookalike_variants (variant, user_id) VALUES (?, ?)',
+                                     sorted(entries))
+                    conn.execute('INSERT OR REPLACE INTO lookalike_state (name, last_id) VALUES (?, ?)',
+                                 (name, rows[-1][0]))
+                    conn.commit()
+                    stats[name] += len(rows)
+            finally:
+                reader.close()
+        return stats
+
+    def rebuild(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Re-index everything from scratch"""
+        conn = self._connection()
+        conn.execute('DELETE FROM lookalike_variants')
+        conn.execute('DELETE FROM lookalike_state')
+        conn.commit()
+        return self.sync(chunk_size)
+
+    def search(self, username, limit=10):
+        """
+        Accounts whose current or past handle is within MAX_DISTANCE of this
+        one after skeleton normalization, closest first. Each entry names the
+        account's current username, the handle that matched and the distance.
+        """
+        with timed('lookalike_search'):
+            conn = self._connection()
+            keys = query_keys(username)
+            hashes = list(variants(keys))
+            if not hashes:
+                return []
+            user_ids = [row[0] for row in conn.execute(
+                f'SELECT DISTINCT user_id FROM lookalike_variants WHERE variant IN ({",".join("?" * len(hashes))}) LIMIT ?',
+                (*hashes, MAX_CANDIDATES)
+            )]
+
+            handles = {}  # user_id -> set of current and past handles
+            current = {}
+            for chunk in _chunks(user_ids, SQL_VARIABLES):
+                placeholders = ','.join('?' * len(chunk))
+                for user_id, handle in conn.execute(
+                    f'SELECT id, username FROM users WHERE id IN ({placeholders})', chunk
+                ):
+                    current[user_id] = handle
+                    handles.setdefault(user_id, set()).add(handle)
+                for user_id, old_username, new_username in conn.execute(
+                    f'SELECT user_id, old_username, new_username FROM username_history WHERE user_id IN ({placeholders})',
+                    chunk
+                ):
+                    handles.setdefault(user_id, set()).update(h for h in (old_username, new_username) if h)
+
+            folded = username.casefold()
+            matches = []
+            for user_id, candidates in handles.items():
+                best = None
+                for handle in candidates:
+                    if handle.casefold() == folded:
+                        continue
+                    candidate = skeleton(handle)
+                    distance = min(edit_distance(key, candidate) for key in keys)
+                    if distance <= MAX_DISTANCE and (best is None or distance < best[0]):
+                        best = (distance, handle)
+                if best is not None:
+                    matches.append({
+                        'user_id': user_id,
+                        'username': current.get(user_id, best[1]),
+                        'matched_handle': best[1],
+                        'distance': best[0],
+                    })
+
+        matches.sort(key=lambda match: (match['distance'], match['username']))
+        return matches[:limit]
+
+    def stats(self):
+        conn = self._connection()
+        return {
+            'variants': conn.execute('SELECT COUNT(*) FROM lookalike_variants').fetchone()[0],
+            **{f'last_{name}_id': last_id for name, last_id in conn.execute('SELECT name, last_id FROM lookalike_state')},
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--db', default='instagram_data.db')
+    parser.add_argument('--rebuild', action='store_true', help='drop the index and build it from scratch')
+    parser.add_argument('--query', help='print look-alikes of this username instead of syncing')
+    parser.add_argument('--limit', type=int, default=10)
+    args = parser.parse_args()
+
+    index = LookalikeIndex(args.db)
+    start = time.perf_counter()
+
+    if args.query:
+        for match in index.search(args.query, args.limit):
+            print(f"   - @{match['username']} (matched {match['matched_handle']}, distance {match['distance']})")
+        print(f"✅ Searched in {(time.perf_counter() - start) * 1000:.1f}ms")
+        return
+
+    stats = index.rebuild() if args.rebuild else index.sync()
+    print(f"✅ Indexed {stats['users']:,} accounts and {stats['history']:,} username changes "
+          f"in {time.perf_counter() - start:.1f}s")
+
+if __name__ == '__main__':
+    main()
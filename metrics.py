@@ -0,0 +1,122 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Upper bounds in seconds, from sub-millisecond SQL up to the upstream timeout
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_request_timings = ContextVar('request_timings', default=None)
+
+class Histogram:
+    """Cumulative-bucket latency histogram with one series per label value"""
+
+    def __init__(self, name, help, label, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label = label
+        self.buckets = tuple(buckets)
+        self._series = {}  # label value -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, seconds):
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(value)
+            if series is None:
+                series = self._series[value] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += seconds
+            series[-1] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = {value: list(counts) for value, counts in self._series.items()}
+        for value, counts in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{self.label}="{value}",le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{self.label}="{value}",le="+Inf"}} {counts[-1]}')
+            lines.append(f'{self.name}_sum{{{self.label}="{value}"}} {counts[-2]:.6f}')
+            lines.append(f'{self.name}_count{{{self.label}="{value}"}} {counts[-1]}')
+        return lines
+
+class Counter:
+    """Monotonic counter with one series per label value"""
+
+    def __init__(self, name, help, label):
+        self.name = name
+        self.help = help
+        self.label = label
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def inc(self, value, amount=1):
+        with self._lock:
+            self._series[value] = self._series.get(value, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        with self._lock:
+            series = dict(self._series)
+        for value, total in sorted(series.items()):
+            lines.append(f'{self.name}{{{self.label}="{value}"}} {total}')
+        return lines
+
+class Gauge:
+    """Value read from a callback at scrape time"""
+
+    def __init__(self, name, help, func):
+        self.name = name
+        self.help = help
+        self.func = func
+
+    def render(self):
+        return [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} gauge', f'{self.name} {self.func()}']
+
+STAGE_SECONDS = Histogram('analysis_stage_seconds', 'Latency of each analysis stage', 'stage')
+ANALYSES = Counter('analyses_total', 'Completed analyses by data source', 'source')
+STORE_ERRORS = Counter('store_errors_total', 'Snapshot and result-history operations that failed', 'store')
+
+_registry = [STAGE_SECONDS, ANALYSES, STORE_ERRORS]
+
+def register_gauge(name, help, func):
+    _registry.append(Gauge(name, help, func))
+
+@contextmanager
+def timed(stage):
+    """Record the duration of a stage in the histogram and the current request's timings"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(stage, elapsed)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + elapsed
+
+@contextmanager
+def request_timings():
+    """Collect per-stage timings for everything run in this context"""
+    timings = {}
+    token = _request_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _request_timings.reset(token)
+
+def format_timings(timings):
+    """Render timings as an X-Timing header value, e.g. 'upstream_fetch=812.4ms, risk_score=0.1ms'"""
+    return ', '.join(f'{stage}={seconds * 1000:.1f}ms' for stage, seconds in timings.items())
+
+def render():
+    """Prometheus text exposition of every registered metric"""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,214 @@
+import sqlite3
+import sys
+
+# Secondary indexes, kept by name so bulk loads can drop and rebuild them
+INDEXES = {
+    # Same-email / same-phone lookups read only the index, never the table
+    'idx_users_email_username': 'CREATE INDEX IF NOT EXISTS idx_users_email_username ON users (email, username)',
+    'idx_users_phone_username': 'CREATE INDEX IF NOT EXISTS idx_users_phone_username ON users (phone, username)',
+    # Covers the per-user history query, already ordered by changed_at
+    'idx_username_history_user_changed': '''
+        CREATE INDEX IF NOT EXISTS idx_username_history_user_changed
+        ON username_history (user_id, changed_at, old_username, new_username)
+    ''',
+    # Finds the accounts renamed since a point in time for windowed burst queries
+    'idx_username_history_changed_user': '''
+        CREATE INDEX IF NOT EXISTS idx_username_history_changed_user
+        ON username_history (changed_at, user_id)
+    ''',
+}
+
+# Bump data_generation whenever linked-account data changes, so results cached
+# under an older generation are never served. Kept by name like INDEXES so bulk
+# loads can drop them and bump the generation once instead of once per row.
+GENERATION_TRIGGERS = {
+    f'trg_{table}_{event.lower()}_generation': f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()}_generation
+        AFTER {event} ON {table}
+        BEGIN
+            UPDATE data_generation SET generation = generation + 1 WHERE id = 1;
+        END
+    '''
+    for table in ('users', 'username_history')
+    for event in ('INSERT', 'UPDATE', 'DELETE')
+}
+
+BUMP_GENERATION = 'UPDATE data_generation SET generation = generation + 1 WHERE id = 1'
+
+# (version, description, statements); versions are recorded in PRAGMA user_version
+MIGRATIONS = [
+    (1, "Create users and username_history tables", [
+        '''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE,
+            email TEXT,
+            phone TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS username_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            old_username TEXT,
+            new_username TEXT,
+            changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+        ''',
+    ]),
+    (2, "Add covering indexes for linked-account lookups", [
+        INDEXES['idx_users_email_username'],
+        INDEXES['idx_users_phone_username'],
+        INDEXES['idx_username_history_user_changed'],
+        'ANALYZE',
+    ]),
+    (3, "Add profile_snapshots for incremental risk recomputation", [
+        '''
+        CREATE TABLE IF NOT EXISTS profile_snapshots (
+            username TEXT PRIMARY KEY,
+            follower_count INTEGER,
+            following_count INTEGER,
+            post_count INTEGER,
+            bio TEXT,
+            is_verified INTEGER,
+            inputs_hash TEXT NOT NULL,
+            previous_risk_score INTEGER,
+            risk_score INTEGER NOT NULL,
+            analyzed_at TIMESTAMP NOT NULL,
+            changed_at TIMESTAMP NOT NULL,
+            change_seq INTEGER NOT NULL
+        )
+        ''',
+        'CREATE UNIQUE INDEX IF NOT EXISTS idx_profile_snapshots_change_seq ON profile_snapshots (change_seq)',
+    ]),
+    (4, "Add scan_jobs and scan_job_items for background bulk scans", [
+        '''
+        CREATE TABLE IF NOT EXISTS scan_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            status TEXT NOT NULL DEFAULT 'pending',
+            total INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS scan_job_items (
+            job_id INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            username TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            result TEXT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (job_id, position),
+            FOREIGN KEY (job_id) REFERENCES scan_jobs (id)
+        )
+        ''',
+        # Workers claim the oldest pending items first
+        'CREATE INDEX IF NOT EXISTS idx_scan_job_items_status ON scan_job_items (status, job_id, position)',
+    ]),
+    (5, "Add data_generation counter bumped by users/username_history triggers", [
+        '''
+        CREATE TABLE IF NOT EXISTS data_generation (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            generation INTEGER NOT NULL
+        )
+        ''',
+        'INSERT OR IGNORE INTO data_generation (id, generation) VALUES (1, 0)',
+        *GENERATION_TRIGGERS.values(),
+    ]),
+    (6, "Add lookalike_variants and lookalike_state for fuzzy username search", [
+        # One row per (hashed delete-variant of a handle's skeleton, account)
+        '''
+        CREATE TABLE IF NOT EXISTS lookalike_variants (
+            variant INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            PRIMARY KEY (variant, user_id)
+        ) WITHOUT ROWID
+        ''',
+        # Last users / username_history ids folded into the index
+        '''
+        CREATE TABLE IF NOT EXISTS lookalike_state (
+            name TEXT PRIMARY KEY,
+            last_id INTEGER NOT NULL
+        )
+        ''',
+    ]),
+    (7, "Add username_history (changed_at, user_id) index for rename-velocity queries", [
+        INDEXES['idx_username_history_changed_user'],
+        'ANALYZE',
+    ]),
+    (8, "Add identity_components and identity_clusters for linked-account clusters", [
+        # Every synced account and the root of its cluster; members are
+        # relabelled on merge, so the root is always one hop away
+        '''
+        CREATE TABLE IF NOT EXISTS identity_components (
+            user_id INTEGER PRIMARY KEY,
+            root INTEGER NOT NULL
+        )
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_identity_components_root ON identity_components (root, user_id)',
+        '''
+        CREATE TABLE IF NOT EXISTS identity_clusters (
+            root INTEGER PRIMARY KEY,
+            size INTEGER NOT NULL
+        )
+        ''',
+        # Last users id folded into the clusters
+        '''
+        CREATE TABLE IF NOT EXISTS identity_state (
+            name TEXT PRIMARY KEY,
+            last_id INTEGER NOT NULL
+        )
+        ''',
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+def current_version(conn):
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+def migrate(conn, target=LATEST_VERSION):
+    """Apply every pending migration up to target, each in its own transaction"""
+    applied = []
+    conn.commit()
+    
+    for version, description, statements in MIGRATIONS:
+        if version <= current_version(conn) or version > target:
+            continue
+        
+        try:
+            conn.execute('BEGIN')
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f'PRAGMA user_version = {int(version)}')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        
+        applied.append((version, description))
+    
+    return applied
+
+def migrate_database(db_path='instagram_data.db'):
+    """Upgrade an existing database file in place"""
+    conn = sqlite3.connect(db_path)
+    try:
+        before = current_version(conn)
+        applied = migrate(conn)
+    finally:
+        conn.close()
+    
+    if not applied:
+        print(f"✅ {db_path} is up to date (schema version {before})")
+        return
+    
+    for version, description in applied:
+        print(f"   - v{version}: {description}")
+    print(f"✅ Migrated {db_path} from schema version {before} to {applied[-1][0]}")
+
+if __name__ == "__main__":
+    migrate_database(*sys.argv[1:2])
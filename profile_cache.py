@@ -0,0 +1,207 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+SHARED_NAMESPACE = 'profile'
+
+class ProfileCache:
+    """
+    Bounded LRU cache of analyzed profiles with a TTL, optionally backed by a
+    SharedCache seen by every worker process on the host and by a SQLite table
+    so entries survive restarts
+    """
+
+    def __init__(self, max_entries=1024, ttl=600, db_path=None, shared=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db_path = db_path
+        self.shared = shared
+
+        self._entries = OrderedDict()  # key -> (stored_at, profile)
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._conn = None
+
+        self.memory_hits = 0
+        self.shared_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if db_path:
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS profile_cache (
+                    username TEXT PRIMARY KEY,
+                    profile TEXT NOT NULL,
+                    stored_at REAL NOT NULL
+                )
+            ''')
+            self._conn.commit()
+
+    @staticmethod
+    def _key(username):
+        # Instagram usernames are case-insensitive
+        return username.strip().lower()
+
+    def get(self, username):
+        """Return (profile, tier, age_seconds) for a fresh entry, or None"""
+        key = self._key(username)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, profile = entry
+                if now - stored_at < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.memory_hits += 1
+                    return dict(profile), 'memory', now - stored_at
+                del self._entries[key]
+
+        if self.shared is not None:
+            entry = self.shared.get(SHARED_NAMESPACE, key)
+            if entry is not None:
+                stored_at, profile = entry
+                with self._lock:
+                    self._remember(key, stored_at, profile)
+                    self.shared_hits += 1
+                return dict(profile), 'shared', now - stored_at
+
+        entry = self._load(key, now)
+        if entry is not None:
+            stored_at, profile = entry
+            with self._lock:
+                self._remember(key, stored_at, profile)
+                self.disk_hits += 1
+            return dict(profile), 'disk', now - stored_at
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, username, profile):
+        """Store a copy of a profile"""
+        key = self._key(username)
+        stored_at = time.time()
+        profile = dict(profile)
+
+        with self._lock:
+            self._remember(key, stored_at, profile)
+        if self.shared is not None:
+            self.shared.set(SHARED_NAMESPACE, key, (stored_at, profile), ttl=self.ttl)
+        self._store(key, stored_at, profile)
+
+    def claim(self, username, seconds):
+        """
+        False when another worker process is already fetching this username
+        (it holds the shared lease); always True without a shared tier
+        """
+        if self.shared is None:
+            return True
+        return self.shared.lease(SHARED_NAMESPACE, self._key(username), seconds)
+
+    def release(self, username):
+        if self.shared is not None:
+            self.shared.release(SHARED_NAMESPACE, self._key(username))
+
+    def wait_for_peer(self, username, timeout):
+        """The profile another process is fetching, or None if it fails or times out"""
+        entry = self.shared.wait(SHARED_NAMESPACE, self._key(username), timeout)
+        if entry is None:
+            return None
+        stored_at, profile = entry
+        with self._lock:
+            self._remember(self._key(username), stored_at, profile)
+            self.shared_hits += 1
+        return dict(profile)
+
+    def invalidate(self, username):
+        """Drop a username from both tiers"""
+        key = self._key(username)
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.shared is not None:
+            self.shared.delete(SHARED_NAMESPACE, key)
+        if self._conn is not None:
+            with self._db_lock:
+                self._conn.execute('DELETE FROM profile_cache WHERE username = ?', (key,))
+                self._conn.commit()
+
+    def clear(self):
+        """Drop every entry from both tiers"""
+        with self._lock:
+            self._entries.clear()
+        if self.shared is not None:
+            self.shared.delete(SHARED_NAMESPACE)
+        if self._conn is not None:
+            with self._db_lock:
+                self._conn.execute('DELETE FROM profile_cache')
+                self._conn.commit()
+
+    def hit_ratio(self):
+        hits = self.memory_hits + self.shared_hits + self.disk_hits
+        lookups = hits + self.misses
+        return round(hits / lookups, 4) if lookups else 0.0
+
+    def stats(self):
+        """Cache counters and entry ages for the stats endpoint"""
+        now = time.time()
+        with self._lock:
+            ages = [now - stored_at for stored_at, _ in self._entries.values()]
+            stats = {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'memory_hits': self.memory_hits,
+                'shared_hits': self.shared_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': self.hit_ratio(),
+                'oldest_entry_age_seconds': round(max(ages), 3) if ages else None,
+                'mean_entry_age_seconds': round(sum(ages) / len(ages), 3) if ages else None,
+                'persistent': self._conn is not None,
+                'shared': self.shared is not None,
+            }
+        return stats
+
+    def _remember(self, key, stored_at, profile):
+        # Caller holds self._lock
+        self._entries[key] = (stored_at, profile)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _load(self, key, now):
+        if self._conn is None:
+            return None
+
+        with self._db_lock:
+            row = self._conn.execute(
+                'SELECT profile, stored_at FROM profile_cache WHERE username = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            profile, stored_at = row
+            if now - stored_at >= self.ttl:
+                self._conn.execute('DELETE FROM profile_cache WHERE username = ?', (key,))
+                self._conn.commit()
+                return None
+
+        return stored_at, json.loads(profile)
+
+    def _store(self, key, stored_at, profile):
+        if self._conn is None:
+            return
+
+        with self._db_lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO profile_cache (username, profile, stored_at) VALUES (?, ?, ?)',
+                (key, json.dumps(profile), stored_at)
+            )
+            self._conn.commit()
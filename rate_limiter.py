@@ -0,0 +1,141 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+# Lower numbers are served first
+INTERACTIVE = 0
+BATCH = 1
+
+BACKOFF_BASE = 1.0   # seconds
+BACKOFF_CAP = 60.0
+
+def backoff_delay(attempt):
+    """Exponential backoff with full jitter for the given retry attempt (0-based)"""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+def retry_after_seconds(value):
+    """Parse a Retry-After header (seconds or HTTP date); None when absent or invalid"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+class RateLimiter:
+    """
+    Token bucket in front of the upstream API. Blocked callers are granted
+    tokens by priority (interactive before batch), FIFO within a priority, and
+    no tokens are granted while the upstream has asked us to back off.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._waiters = []  # heap of (priority, sequence)
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+
+        self.granted = 0
+        self.timeouts = 0
+        self.throttled = 0
+
+    def acquire(self, priority=BATCH, timeout=None):
+        """Block until a token is granted; False if timeout expires first"""
+        ticket = (priority, next(self._sequence))
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._cond:
+            heapq.heappush(self._waiters, ticket)
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+
+                if self._waiters[0] == ticket:
+                    wait = self._wait_time(now)
+                    if wait <= 0:
+                        heapq.heappop(self._waiters)
+                        self._tokens -= 1
+                        self.granted += 1
+                        self._cond.notify_all()
+                        return True
+                else:
+                    # Woken up when the head of the queue is served
+                    wait = None
+
+                if deadline is not None:
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self._waiters.remove(ticket)
+                        heapq.heapify(self._waiters)
+                        self.timeouts += 1
+                        self._cond.notify_all()
+                        return False
+                    wait = remaining if wait is None else min(wait, remaining)
+
+                self._cond.wait(wait)
+
+    def reserve(self):
+        """
+        Non-blocking acquire for event-loop callers: take a token and return 0,
+        or return how many seconds to sleep before trying again
+        """
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            # Queued threads keep their place ahead of event-loop callers
+            wait = self._wait_time(now) if not self._waiters else 1.0 / self.rate
+            if wait > 0:
+                return wait
+            self._tokens -= 1
+            self.granted += 1
+            return 0.0
+
+    def penalize(self, seconds):
+        """Stop granting tokens for the given number of seconds (e.g. after a 429)"""
+        with self._cond:
+            self.throttled += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            return {
+                'rate_per_second': self.rate,
+                'burst': self.burst,
+                'tokens': round(self._tokens, 3),
+                'waiting': len(self._waiters),
+                'granted': self.granted,
+                'timeouts': self.timeouts,
+                'throttled': self.throttled,
+                'paused_for_seconds': round(max(0.0, self._paused_until - now), 3),
+            }
+
+    # Callers below hold self._cond
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _wait_time(self, now):
+        if now < self._paused_until:
+            return self._paused_until - now
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) / self.rate
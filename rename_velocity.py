@@ -0,0 +1,123 @@
+import sqlite3
+import threading
+
+from metrics import timed
+
+# Sliding windows, in days (julianday units)
+WINDOWS = {'24h': 1, '7d': 7, '30d': 30}
+
+# Renames inside one window that count as burst renaming
+BURST_THRESHOLDS = {'24h': 3, '7d': 5, '30d': 8}
+
+def rolling_counts(order_by):
+    """
+    COUNT(*) window columns in_24h, in_7d, in_30d over one account's renames:
+    renames in the window ending at each row (inclusive). order_by must be a
+    julianday expression.
+    """
+    return ',\n'.join(
+        f'COUNT(*) OVER (ORDER BY {order_by} RANGE BETWEEN {days} PRECEDING AND CURRENT ROW) AS in_{name}'
+        for name, days in WINDOWS.items()
+    )
+
+def is_burst(velocity):
+    """True when any window's peak reaches its burst threshold"""
+    return any(velocity.get(name, 0) >= threshold for name, threshold in BURST_THRESHOLDS.items())
+
+def peak_velocity(timeline):
+    """Highest rolling count per window over a timeline()"""
+    return {name: max((entry[f'renames_{name}'] for entry in timeline), default=0) for name in WINDOWS}
+
+TIMELINE_QUERY = f'''
+    SELECT h.old_username, h.new_username, h.changed_at,
+           {rolling_counts('julianday(h.changed_at)')}
+    FROM users u JOIN username_history h ON h.user_id = u.id
+    WHERE u.username = ?
+    ORDER BY h.changed_at
+'''
+
+# LAG(changed_at, n) is the rename n places earlier, so a span of at most
+# `days` means n + 1 renames inside the window. Rows come off
+# idx_username_history_user_changed already partitioned and ordered.
+BURSTS_QUERY = '''
+    WITH spans AS (
+        SELECT user_id,
+               LAG(changed_at, :renames) OVER (PARTITION BY user_id ORDER BY changed_at) AS burst_start,
+               changed_at AS burst_end
+        FROM username_history
+        WHERE :since IS NULL OR user_id IN (
+            SELECT user_id FROM username_history WHERE changed_at >= :since
+        )
+    )
+    SELECT s.user_id, u.username, s.burst_start, s.burst_end,
+           MIN(julianday(s.burst_end) - julianday(s.burst_start)) AS span_days
+    FROM spans s LEFT JOIN users u ON u.id = s.user_id
+    WHERE s.burst_start IS NOT NULL
+      AND julianday(s.burst_end) - julianday(s.burst_start) <= :days
+      AND (:since IS NULL OR s.burst_end >= :since)
+    GROUP BY s.user_id
+    ORDER BY span_days, s.user_id
+    LIMIT :limit
+'''
+
+class RenameTimeline:
+    """Username-change timelines and burst-renaming queries over username_history"""
+
+    def __init__(self, db_path="instagram_data.db"):
+        self.db_path = db_path
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def timeline(self, username):
+        """Every rename of an account, oldest first, with the rolling window counts"""
+        with timed('rename_timeline_sql'):
+            rows = self._connection().execute(TIMELINE_QUERY, (username,)).fetchall()
+        return [
+            {
+                'old_username': old_username,
+                'new_username': new_username,
+                'changed_at': changed_at,
+                **{f'renames_{name}': count for name, count in zip(WINDOWS, counts)},
+            }
+            for old_username, new_username, changed_at, *counts in rows
+        ]
+
+    def velocity(self, username):
+        """Peak number of renames inside each sliding window"""
+        return peak_velocity(self.timeline(username))
+
+    def bursts(self, min_renames, window='24h', since=None, limit=100):
+        """
+        Accounts with at least min_renames renames inside one `window`, tightest
+        burst first. since ('YYYY-MM-DD HH:MM:SS') keeps only bursts ending
+        after it and only scans accounts renamed since then.
+        """
+        if window not in WINDOWS:
+            raise ValueError(f"window must be one of {', '.join(WINDOWS)}")
+        if min_renames < 2:
+            raise ValueError("min_renames must be at least 2")
+
+        with timed('rename_bursts_sql'):
+            rows = self._connection().execute(BURSTS_QUERY, {
+                'renames': min_renames - 1,
+                'days': WINDOWS[window],
+                'since': since,
+                'limit': limit,
+            }).fetchall()
+        return [
+            {
+                'user_id': user_id,
+                'username': username,
+                'burst_start': burst_start,
+                'burst_end': burst_end,
+                'span_hours': round(span_days * 24, 2),
+            }
+            for user_id, username, burst_start, burst_end, span_days in rows
+        ]
@@ -0,0 +1,149 @@
+import atexit
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa = None
+
+DEFAULT_FLUSH_ROWS = 1000
+
+# Columns kept from every analysis result, in file order
+FIELDS = [
+    ('username', 'string'),
+    ('full_name', 'string'),
+    ('is_private', 'bool'),
+    ('is_verified', 'bool'),
+    ('follower_count', 'int64'),
+    ('following_count', 'int64'),
+    ('post_count', 'int64'),
+    ('bio', 'string'),
+    ('profile_pic', 'string'),
+    ('risk_score', 'int64'),
+    ('is_high_risk', 'bool'),
+    ('data_source', 'string'),
+    ('analysis_time', 'timestamp'),
+    ('instagram_url', 'string'),
+    ('note', 'string'),
+    ('fallback_reason', 'string'),
+]
+
+def _schema():
+    types = {'string': pa.string(), 'bool': pa.bool_(), 'int64': pa.int64(), 'timestamp': pa.timestamp('s')}
+    return pa.schema([(name, types[kind]) for name, kind in FIELDS])
+
+class ResultStore:
+    """
+    Append-only columnar history of analysis results: Arrow IPC files
+    partitioned by analysis date (date=YYYY-MM-DD/part-*.arrow) and read back
+    through memory maps, so queries never load the whole history.
+    """
+
+    def __init__(self, directory='analysis_results', flush_rows=DEFAULT_FLUSH_ROWS):
+        if pa is None:
+            raise RuntimeError("pyarrow is required for the results store (pip install pyarrow)")
+
+        self.directory = directory
+        self.flush_rows = flush_rows
+        self.schema = _schema()
+        self._buffer = []
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        atexit.register(self.flush)
+
+    def append(self, result):
+        """Buffer one analysis result; written out every flush_rows results"""
+        row = {name: result.get(name) for name, _ in FIELDS}
+        row['analysis_time'] = datetime.strptime(result['analysis_time'], '%Y-%m-%d %H:%M:%S')
+
+        with self._lock:
+            self._buffer.append(row)
+            if len(self._buffer) < self.flush_rows:
+                return
+            rows, self._buffer = self._buffer, []
+        self._write(rows)
+
+    def flush(self):
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+        if rows:
+            self._write(rows)
+
+    def query(self, username=None, start=None, end=None, columns=None):
+        """
+        Results for a username and/or analysis-time window [start, end) as a
+        pyarrow Table. Only partitions inside the window are opened; results
+        not yet flushed are read from the buffer, so querying never writes.
+        """
+        with self._lock:
+            buffered = list(self._buffer)
+
+        tables = []
+        for path in self._partition_files(start, end):
+            # The table's buffers keep the memory map open for as long as they are used
+            tables.append(pa.ipc.open_file(pa.memory_map(path)).read_all())
+        if buffered:
+            tables.append(pa.Table.from_pylist(buffered, schema=self.schema))
+
+        tables = [self._filter(table, username, start, end, columns) for table in tables]
+        tables = [table for table in tables if table.num_rows]
+        if not tables:
+            schema = self.schema if not columns else pa.schema([self.schema.field(c) for c in columns])
+            return schema.empty_table()
+        return pa.concat_tables(tables)
+
+    def _filter(self, table, username, start, end, columns):
+        mask = None
+        if username is not None:
+            mask = pc.equal(table['username'], username)
+        if start is not None:
+            mask = self._and(mask, pc.greater_equal(table['analysis_time'], pa.scalar(start, pa.timestamp('s'))))
+        if end is not None:
+            mask = self._and(mask, pc.less(table['analysis_time'], pa.scalar(end, pa.timestamp('s'))))
+        if mask is not None:
+            table = table.filter(mask)
+        if columns:
+            table = table.select(columns)
+        return table
+
+    @staticmethod
+    def _and(mask, condition):
+        return condition if mask is None else pc.and_(mask, condition)
+
+    def _partition_files(self, start, end):
+        first_day = start.date() if start else None
+        # end is exclusive, so midnight belongs to the previous day's partition
+        last_day = (end - timedelta(microseconds=1)).date() if end else None
+
+        for partition in sorted(os.listdir(self.directory)):
+            if not partition.startswith('date='):
+                continue
+            day = datetime.strptime(partition[len('date='):], '%Y-%m-%d').date()
+            if (first_day and day < first_day) or (last_day and day > last_day):
+                continue
+            partition_dir = os.path.join(self.directory, partition)
+            for name in sorted(os.listdir(partition_dir)):
+                if name.endswith('.arrow'):
+                    yield os.path.join(partition_dir, name)
+
+    def _write(self, rows):
+        by_day = {}
+        for row in rows:
+            by_day.setdefault(row['analysis_time'].strftime('%Y-%m-%d'), []).append(row)
+
+        for day, day_rows in by_day.items():
+            partition_dir = os.path.join(self.directory, f'date={day}')
+            os.makedirs(partition_dir, exist_ok=True)
+            name = f'part-{time.time_ns()}-{os.getpid()}-{threading.get_ident()}.arrow'
+            path = os.path.join(partition_dir, name)
+
+            table = pa.Table.from_pylist(day_rows, schema=self.schema)
+            # Write under a temporary name so readers never see a partial file
+            with pa.OSFile(path + '.tmp', 'wb') as sink:
+                with pa.ipc.new_file(sink, self.schema) as writer:
+                    writer.write_table(table)
+            os.replace(path + '.tmp', path)
@@ -0,0 +1,158 @@
+import numpy as np
+
+from username_features import UsernameFeatures
+
+MAX_RISK = 100
+
+# Part of every stored score's fingerprint (snapshot_store.risk_inputs_hash):
+# bump it whenever a rule or threshold below changes so unchanged accounts
+# are re-scored instead of keeping the old score
+RULES_VERSION = 1
+
+# Real-profile rules. Threshold tables are (upper bound, points), checked in
+# order with the first bound the value falls below winning.
+FOLLOWER_RATIO_POINTS = ((0.01, 40), (0.1, 25), (0.5, 10))   # followers / following
+POST_COUNT_POINTS = ((1, 30), (5, 20), (10, 10))
+MIN_BIO_LENGTH = 10
+SHORT_BIO_POINTS = 15
+UNVERIFIED_POINTS = 5
+
+# Simulated-profile rules
+DIGIT_RUN_POINTS = 20
+SEPARATOR_RUN_POINTS = 15
+MIN_USERNAME_LENGTH = 5
+SHORT_USERNAME_POINTS = 25
+HIGH_FOLLOWER_POST_RATIO = 1000
+HIGH_FOLLOWER_POST_RATIO_POINTS = 20   # many followers, few posts
+LOW_FOLLOWER_POST_RATIO = 1
+LOW_FOLLOWER_POST_RATIO_POINTS = 15    # many posts, few followers
+SIMULATED_POST_COUNT_POINTS = ((5, 20), (10, 10))
+
+def _points(value, table):
+    for bound, points in table:
+        if value < bound:
+            return points
+    return 0
+
+def _select(values, table):
+    return np.select([values < bound for bound, _ in table], [points for _, points in table], 0)
+
+def risk_score(followers, following, posts, bio_length, verified):
+    """Risk score of one real profile; bio_length is the length of the stripped biography"""
+    score = 0
+    
+    # Follower ratio analysis
+    if following > 0:
+        score += _points(followers / following, FOLLOWER_RATIO_POINTS)
+    
+    # Post activity
+    score += _points(posts, POST_COUNT_POINTS)
+    
+    # Profile completeness
+    if bio_length < MIN_BIO_LENGTH:
+        score += SHORT_BIO_POINTS
+    
+    # Verification status
+    if not verified:
+        score += UNVERIFIED_POINTS
+    
+    return min(MAX_RISK, score)
+
+def simulated_risk_score(username_length, has_digit_run, has_separator_run, followers, posts):
+    """Risk score of one simulated profile"""
+    score = 0
+    
+    # Username pattern analysis
+    if has_digit_run:
+        score += DIGIT_RUN_POINTS
+    if has_separator_run:
+        score += SEPARATOR_RUN_POINTS
+    if username_length < MIN_USERNAME_LENGTH:
+        score += SHORT_USERNAME_POINTS
+    
+    # Follower-post ratio
+    if posts > 0:
+        ratio = followers / posts
+        if ratio > HIGH_FOLLOWER_POST_RATIO:
+            score += HIGH_FOLLOWER_POST_RATIO_POINTS
+        elif ratio < LOW_FOLLOWER_POST_RATIO:
+            score += LOW_FOLLOWER_POST_RATIO_POINTS
+    
+    # Account activity level
+    score += _points(posts, SIMULATED_POST_COUNT_POINTS)
+    
+    return min(MAX_RISK, score)
+
+def username_feature_columns(usernames):
+    """Columns of username features for the batch scorers, extracted through the shared memo"""
+    features = [UsernameFeatures.from_username(username) for username in usernames]
+    return {
+        'username_length': np.fromiter((f.length for f in features), dtype=np.int64, count=len(features)),
+        'has_digit_run': np.fromiter((f.has_digit_run for f in features), dtype=bool, count=len(features)),
+        'has_separator_run': np.fromiter((f.has_separator_run for f in features), dtype=bool, count=len(features)),
+    }
+
+def risk_scores(followers, following, posts, bio_length, verified):
+    """
+    Vectorized risk_score. Every argument is a column with one entry per
+    profile; bio_length is the length of the stripped biography
+    """
+    followers = np.asarray(followers, dtype=np.float64)
+    following = np.asarray(following, dtype=np.float64)
+    posts = np.asarray(posts, dtype=np.int64)
+    bio_length = np.asarray(bio_length, dtype=np.int64)
+    verified = np.asarray(verified, dtype=bool)
+    
+    # Follower ratio analysis (no points when the account follows nobody)
+    ratio = np.divide(followers, following, out=np.full(followers.shape, np.inf), where=following > 0)
+    score = _select(ratio, FOLLOWER_RATIO_POINTS)
+    
+    # Post activity
+    score += _select(posts, POST_COUNT_POINTS)
+    
+    # Profile completeness
+    score += np.where(bio_length < MIN_BIO_LENGTH, SHORT_BIO_POINTS, 0)
+    
+    # Verification status
+    score += np.where(verified, 0, UNVERIFIED_POINTS)
+    
+    return np.minimum(score, MAX_RISK)
+
+def simulated_risk_scores(username_length, has_digit_run, has_separator_run, followers, posts):
+    """
+    Vectorized simulated_risk_score. has_digit_run marks usernames with 4+
+    consecutive digits, has_separator_run those with 3+ consecutive '._-'
+    """
+    username_length = np.asarray(username_length, dtype=np.int64)
+    has_digit_run = np.asarray(has_digit_run, dtype=bool)
+    has_separator_run = np.asarray(has_separator_run, dtype=bool)
+    followers = np.asarray(followers, dtype=np.float64)
+    posts = np.asarray(posts, dtype=np.int64)
+    
+    # Username pattern analysis
+    score = np.where(has_digit_run, DIGIT_RUN_POINTS, 0)
+    score += np.where(has_separator_run, SEPARATOR_RUN_POINTS, 0)
+    score += np.where(username_length < MIN_USERNAME_LENGTH, SHORT_USERNAME_POINTS, 0)
+    
+    # Follower-post ratio (a neutral ratio when there are no posts)
+    ratio = np.divide(followers, posts, out=np.full(followers.shape, float(LOW_FOLLOWER_POST_RATIO)), where=posts > 0)
+    score += np.select(
+        [ratio > HIGH_FOLLOWER_POST_RATIO, ratio < LOW_FOLLOWER_POST_RATIO],
+        [HIGH_FOLLOWER_POST_RATIO_POINTS, LOW_FOLLOWER_POST_RATIO_POINTS],
+        0,
+    )
+    
+    # Account activity level
+    score += _select(posts, SIMULATED_POST_COUNT_POINTS)
+    
+    return np.minimum(score, MAX_RISK)
+
+def score_batch(followers, following, posts, bio_length, verified,
+                username_length, has_digit_run, has_separator_run, simulated):
+    """
+    Score a mixed archive in one pass: rows flagged as simulated use the
+    simulated rules, all other rows use the real-profile rules
+    """
+    real = risk_scores(followers, following, posts, bio_length, verified)
+    fake = simulated_risk_scores(username_length, has_digit_run, has_separator_run, followers, posts)
+    return np.where(np.asarray(simulated, dtype=bool), fake, real)
@@ -0,0 +1,175 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+
+# tmpfs keeps the file in RAM, so the store never waits on a disk
+SHARED_MEMORY_DIR = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+DEFAULT_PATH = os.path.join(SHARED_MEMORY_DIR, 'instagram_shared_cache.db')
+
+MMAP_SIZE = 256 * 1024 * 1024
+PRUNE_EVERY = 1000        # writes between sweeps of expired entries
+POLL_SECONDS = 0.05
+
+class SharedCache:
+    """
+    Key/value store shared by every worker process on a host: one memory-mapped
+    SQLite file in WAL mode. Each write is a single atomic statement, and
+    leases let one process fetch a key while the others wait for its value.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, ttl=600, max_entries=100000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # Identifies this process's leases; pids can be reused after a restart
+        self.owner = f'{os.getpid()}-{uuid.uuid4().hex[:8]}'
+        self._local = threading.local()
+        self._counter_lock = threading.Lock()
+        self._writes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.lease_waits = 0
+
+        conn = self._connection()
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS shared_cache (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_shared_cache_expires ON shared_cache (expires_at);
+            CREATE TABLE IF NOT EXISTS shared_leases (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            ) WITHOUT ROWID;
+        ''')
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Autocommit: every statement is its own transaction
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            # A cache can be rebuilt, so skip fsyncs
+            conn.execute('PRAGMA synchronous=OFF')
+            conn.execute(f'PRAGMA mmap_size={MMAP_SIZE}')
+            self._local.conn = conn
+        return conn
+
+    def get(self, namespace, key):
+        """The stored value, or None when missing or expired"""
+        value = self._load(namespace, key)
+        with self._counter_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def _load(self, namespace, key):
+        row = self._connection().execute(
+            'SELECT value FROM shared_cache WHERE namespace = ? AND key = ? AND expires_at > ?',
+            (namespace, key, time.time())
+        ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def set(self, namespace, key, value, ttl=None):
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        conn = self._connection()
+        conn.execute(
+            'INSERT OR REPLACE INTO shared_cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)',
+            (namespace, key, json.dumps(value), expires_at)
+        )
+
+        with self._counter_lock:
+            self._writes += 1
+            prune = self._writes % PRUNE_EVERY == 0
+        if prune:
+            self.prune()
+
+    def delete(self, namespace, key=None):
+        """Drop one key, or a whole namespace when key is None"""
+        if key is None:
+            self._connection().execute('DELETE FROM shared_cache WHERE namespace = ?', (namespace,))
+        else:
+            self._connection().execute(
+                'DELETE FROM shared_cache WHERE namespace = ? AND key = ?', (namespace, key)
+            )
+
+    def lease(self, namespace, key, seconds):
+        """
+        Claim the right to compute a key for `seconds`. False while another
+        process holds an unexpired lease on it.
+        """
+        now = time.time()
+        cursor = self._connection().execute('''
+            INSERT INTO shared_leases (namespace, key, owner, expires_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT (namespace, key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+            WHERE shared_leases.expires_at <= ? OR shared_leases.owner = excluded.owner
+        ''', (namespace, key, self.owner, now + seconds, now))
+        return cursor.rowcount == 1
+
+    def release(self, namespace, key):
+        self._connection().execute(
+            'DELETE FROM shared_leases WHERE namespace = ? AND key = ? AND owner = ?',
+            (namespace, key, self.owner)
+        )
+
+    def wait(self, namespace, key, timeout):
+        """
+        Poll for a value another process is computing. Returns None on timeout
+        or once the lease is gone without a value (the other fetch failed).
+        """
+        with self._counter_lock:
+            self.lease_waits += 1
+        deadline = time.monotonic() + timeout
+        conn = self._connection()
+
+        while time.monotonic() < deadline:
+            value = self._load(namespace, key)
+            if value is not None:
+                return value
+            leased = conn.execute(
+                'SELECT 1 FROM shared_leases WHERE namespace = ? AND key = ? AND expires_at > ?',
+                (namespace, key, time.time())
+            ).fetchone()
+            if leased is None:
+                return None
+            time.sleep(POLL_SECONDS)
+        return None
+
+    def prune(self):
+        """Drop expired entries and leases, then the soonest-expiring entries over max_entries"""
+        conn = self._connection()
+        now = time.time()
+        conn.execute('DELETE FROM shared_cache WHERE expires_at <= ?', (now,))
+        conn.execute('DELETE FROM shared_leases WHERE expires_at <= ?', (now,))
+        conn.execute('''
+            DELETE FROM shared_cache WHERE (namespace, key) IN (
+                SELECT namespace, key FROM shared_cache ORDER BY expires_at DESC LIMIT -1 OFFSET ?
+            )
+        ''', (self.max_entries,))
+
+    def stats(self):
+        entries = self._connection().execute('SELECT COUNT(*) FROM shared_cache').fetchone()[0]
+        with self._counter_lock:
+            lookups = self.hits + self.misses
+            return {
+                'path': self.path,
+                'entries': entries,
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'lease_waits': self.lease_waits,
+            }
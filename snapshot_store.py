@@ -0,0 +1,145 @@
+import hashlib
+import json
+import sqlite3
+import threading
+from datetime import datetime
+
+from migrations import migrate
+from risk_scoring import RULES_VERSION
+
+# An unchanged account's analyzed_at is refreshed at most this often, so
+# repeat analyses of the same account do not each take the write lock
+ANALYZED_AT_REFRESH = 3600  # seconds
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+def risk_inputs_hash(user_data):
+    """Fingerprint of the scoring rules and exactly the fields calculate_risk_score reads"""
+    inputs = [
+        RULES_VERSION,
+        user_data['edge_followed_by']['count'],
+        user_data['edge_follow']['count'],
+        user_data['edge_owner_to_timeline_media']['count'],
+        user_data['biography'] or '',
+        bool(user_data['is_verified']),
+    ]
+    return hashlib.sha1(json.dumps(inputs).encode('utf-8')).hexdigest()
+
+class SnapshotStore:
+    """
+    Last analyzed snapshot of every real account. A new analysis only counts
+    as a change (new change_seq, listeners notified) when the risk inputs differ.
+    """
+
+    def __init__(self, db_path="instagram_data.db"):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._listeners = []
+        migrate(self._connection())
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def subscribe(self, callback):
+        """Call callback(change) whenever an account's risk inputs change"""
+        self._listeners.append(callback)
+
+    def cached_score(self, username, inputs_hash):
+        """Stored risk score if the account was last analyzed with the same inputs"""
+        row = self._connection().execute(
+            'SELECT risk_score FROM profile_snapshots WHERE username = ? AND inputs_hash = ?',
+            (username, inputs_hash)
+        ).fetchone()
+        return row[0] if row else None
+
+    def record(self, profile, inputs_hash):
+        """Store a real profile's snapshot; returns the change dict, or None if nothing changed"""
+        conn = self._connection()
+        analyzed = datetime.now()
+        now = analyzed.strftime(TIME_FORMAT)
+
+        # Unchanged accounts, the common case, are settled with a plain read
+        previous = conn.execute(
+            'SELECT inputs_hash, analyzed_at FROM profile_snapshots WHERE username = ?',
+            (profile['username'],)
+        ).fetchone()
+        if previous and previous[0] == inputs_hash:
+            if (analyzed - datetime.strptime(previous[1], TIME_FORMAT)).total_seconds() >= ANALYZED_AT_REFRESH:
+                conn.execute('UPDATE profile_snapshots SET analyzed_at = ? WHERE username = ? AND inputs_hash = ?',
+                             (now, profile['username'], inputs_hash))
+                conn.commit()
+            return None
+
+        # IMMEDIATE so concurrent writers cannot hand out the same change_seq
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            previous = conn.execute(
+                'SELECT inputs_hash, risk_score FROM profile_snapshots WHERE username = ?',
+                (profile['username'],)
+            ).fetchone()
+
+            if previous and previous[0] == inputs_hash:
+                # Recorded by another writer since the read above
+                conn.commit()
+                return None
+
+            change_seq = conn.execute(
+                'SELECT COALESCE(MAX(change_seq), 0) + 1 FROM profile_snapshots'
+            ).fetchone()[0]
+            change = {
+                'username': profile['username'],
+                'follower_count': profile['follower_count'],
+                'following_count': profile['following_count'],
+                'post_count': profile['post_count'],
+                'bio': profile['bio'],
+                'is_verified': profile['is_verified'],
+                'previous_risk_score': previous[1] if previous else None,
+                'risk_score': profile['risk_score'],
+                'changed_at': now,
+                'change_seq': change_seq,
+            }
+            conn.execute('''
+                INSERT OR REPLACE INTO profile_snapshots (
+                    username, follower_count, following_count, post_count, bio, is_verified,
+                    inputs_hash, previous_risk_score, risk_score, analyzed_at, changed_at, change_seq
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                change['username'], change['follower_count'], change['following_count'],
+                change['post_count'], change['bio'], change['is_verified'], inputs_hash,
+                change['previous_risk_score'], change['risk_score'], now, now, change_seq,
+            ))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        for listener in self._listeners:
+            listener(change)
+        return change
+
+    def changes_since(self, since=0, limit=1000, risk_moved_only=True):
+        """Snapshots changed after change_seq `since`, oldest first, plus the next cursor"""
+        query = '''
+            SELECT username, follower_count, following_count, post_count, is_verified,
+                   previous_risk_score, risk_score, changed_at, change_seq
+            FROM profile_snapshots
+            WHERE change_seq > ?
+        '''
+        if risk_moved_only:
+            query += ' AND previous_risk_score IS NOT risk_score'
+        query += ' ORDER BY change_seq LIMIT ?'
+
+        columns = ['username', 'follower_count', 'following_count', 'post_count', 'is_verified',
+                   'previous_risk_score', 'risk_score', 'changed_at', 'change_seq']
+        changes = [dict(zip(columns, row)) for row in self._connection().execute(query, (since, limit))]
+        for change in changes:
+            change['is_verified'] = bool(change['is_verified'])
+
+        return {
+            'changes': changes,
+            'next_since': changes[-1]['change_seq'] if changes else since,
+        }
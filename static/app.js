@@ -0,0 +1,220 @@
+async function analyzeAccount() {
+    const username = document.getElementById('username').value.trim();
+    const resultDiv = document.getElementById('result');
+    const resultContent = document.getElementById('resultContent');
+
+    if (!username) {
+        alert('Please enter a username');
+        return;
+    }
+
+    resultContent.innerHTML = `
+        <div class="loading">
+            <h3>🔍 Analyzing @${username}</h3>
+            <p>Fetching account data...</p>
+        </div>
+    `;
+    resultDiv.style.display = 'block';
+
+    try {
+        const response = await fetch('/analyze', {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({username: username})
+        });
+
+        const data = await response.json();
+
+        if (data.error) {
+            resultContent.innerHTML = `
+                <div class="result-content risk-high">
+                    <h3>❌ Error</h3>
+                    <p>${data.error}</p>
+                    <p><small>Try using a VPN or different network</small></p>
+                </div>
+            `;
+            return;
+        }
+
+        displayResults(data);
+
+    } catch (error) {
+        resultContent.innerHTML = `
+            <div class="result-content risk-high">
+                <h3>❌ Network Error</h3>
+                <p>Please check your connection and try again</p>
+            </div>
+        `;
+    }
+}
+
+function displayResults(data) {
+    const resultDiv = document.getElementById('result');
+    const resultContent = document.getElementById('resultContent');
+
+    let riskClass = 'risk-low';
+    let riskBadge = '<span class="risk-badge badge-low">LOW RISK</span>';
+    if (data.risk_score > 70) {
+        riskClass = 'risk-high';
+        riskBadge = '<span class="risk-badge badge-high">HIGH RISK</span>';
+    } else if (data.risk_score > 40) {
+        riskClass = 'risk-medium';
+        riskBadge = '<span class="risk-badge badge-medium">MEDIUM RISK</span>';
+    }
+
+    resultContent.innerHTML = `
+        <div class="result-content ${riskClass}">
+            <div class="profile-header">
+                <div class="profile-info">
+                    <h2>@${data.username} ${riskBadge}</h2>
+                    <p><strong>${data.full_name}</strong></p>
+                    <p>${data.bio || 'No bio available'}</p>
+                    <a href="${data.instagram_url}" target="_blank" class="instagram-link">
+                        🔗 View Instagram Profile
+                    </a>
+                </div>
+            </div>
+
+            <div class="data-source">
+                <strong>Data Source:</strong> ${data.data_source}<br>
+                <strong>Analysis Time:</strong> ${data.analysis_time}
+                ${data.note ? `<br><strong>Note:</strong> ${data.note}` : ''}
+            </div>
+
+            <div class="stats-grid">
+                <div class="stat-item">
+                    <div class="stat-value">${data.follower_count.toLocaleString()}</div>
+                    <div>Followers</div>
+                </div>
+                <div class="stat-item">
+                    <div class="stat-value">${data.following_count.toLocaleString()}</div>
+                    <div>Following</div>
+                </div>
+                <div class="stat-item">
+                    <div class="stat-value">${data.post_count.toLocaleString()}</div>
+                    <div>Posts</div>
+                </div>
+                <div class="stat-item">
+                    <div class="stat-value">${data.risk_score}%</div>
+                    <div>Risk Score</div>
+                </div>
+            </div>
+
+            <div style="margin: 20px 0;">
+                <p><strong>Account Status:</strong></p>
+                <p>✅ Verified: ${data.is_verified ? 'Yes' : 'No'}</p>
+                <p>🔒 Private: ${data.is_private ? 'Yes' : 'No'}</p>
+                <p>🎯 Risk Level: ${data.is_high_risk ? '🚨 HIGH RISK' : '⚠️ MEDIUM/LOW RISK'}</p>
+            </div>
+
+            <div style="background: #f8f9fa; padding: 15px; border-radius: 8px;">
+                <h4>📊 Risk Analysis Factors:</h4>
+                <ul style="margin-left: 20px;">
+                    <li>Follower/Following ratio</li>
+                    <li>Post activity level</li>
+                    <li>Profile completeness</li>
+                    <li>Username patterns</li>
+                    <li>Verification status</li>
+                </ul>
+            </div>
+        </div>
+    `;
+
+    resultDiv.className = `result ${riskClass}`;
+}
+
+const BULK_STATUS_LABELS = {real: '✅ Real', simulated: '🧪 Simulated', error: '❌ Error'};
+
+function showView(name) {
+    document.querySelectorAll('.view').forEach(function(view) {
+        view.hidden = view.id !== `${name}View`;
+    });
+    document.querySelectorAll('.tab').forEach(function(tab) {
+        tab.classList.toggle('active', tab.dataset.view === name);
+    });
+}
+
+function bulkRow(item) {
+    const row = document.createElement('tr');
+    const profile = item.result || {};
+    const cells = [
+        item.index + 1,
+        `@${item.username}`,
+        BULK_STATUS_LABELS[item.status] || item.status,
+        profile.follower_count !== undefined ? profile.follower_count.toLocaleString() : '-',
+        profile.risk_score !== undefined ? `${profile.risk_score}%` : '-',
+        item.error || '',
+    ];
+    cells.forEach(function(value) {
+        const cell = document.createElement('td');
+        cell.textContent = value;
+        row.appendChild(cell);
+    });
+    if (profile.risk_score > 70) row.className = 'risk-high';
+    else if (profile.risk_score > 40) row.className = 'risk-medium';
+    return row;
+}
+
+async function analyzeBulk() {
+    const usernames = document.getElementById('bulkUsernames').value
+        .split('\n').map(function(line) { return line.trim(); }).filter(Boolean);
+    const button = document.getElementById('bulkButton');
+    const status = document.getElementById('bulkStatus');
+    const body = document.getElementById('bulkResults');
+
+    if (!usernames.length) {
+        alert('Please enter at least one username');
+        return;
+    }
+
+    body.innerHTML = '';
+    button.disabled = true;
+    document.getElementById('bulkTable').hidden = false;
+    let done = 0;
+    const counts = {real: 0, simulated: 0, error: 0};
+    status.textContent = `Analyzing 0 / ${usernames.length}...`;
+
+    try {
+        // One NDJSON line per account arrives as soon as it is analyzed
+        const response = await fetch('/analyze/stream', {
+            method: 'POST',
+            headers: {'Content-Type': 'text/plain'},
+            body: usernames.join('\n')
+        });
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffered = '';
+
+        while (true) {
+            const {value, done: finished} = await reader.read();
+            if (finished) break;
+            buffered += decoder.decode(value, {stream: true});
+            const lines = buffered.split('\n');
+            buffered = lines.pop();
+            lines.filter(Boolean).forEach(function(line) {
+                const item = JSON.parse(line);
+                body.appendChild(bulkRow(item));
+                counts[item.status] = (counts[item.status] || 0) + 1;
+                done += 1;
+            });
+            status.textContent = `Analyzing ${done} / ${usernames.length}...`;
+        }
+        status.textContent = `Done: ${done} accounts (${counts.real} real, ` +
+            `${counts.simulated} simulated, ${counts.error} errors)`;
+    } catch (error) {
+        status.textContent = `❌ Network error after ${done} accounts`;
+    } finally {
+        button.disabled = false;
+    }
+}
+
+document.getElementById('analyzeButton').addEventListener('click', analyzeAccount);
+document.getElementById('bulkButton').addEventListener('click', analyzeBulk);
+document.querySelectorAll('.tab').forEach(function(tab) {
+    tab.addEventListener('click', function() { showView(tab.dataset.view); });
+});
+
+// Enter key support
+document.getElementById('username').addEventListener('keypress', function(e) {
+    if (e.key === 'Enter') analyzeAccount();
+});
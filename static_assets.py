@@ -0,0 +1,114 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+from collections import namedtuple
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Fingerprinted URLs change whenever the content does, so they never need revalidating
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+PAGE_CACHE_CONTROL = 'public, max-age=300'
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+MIN_COMPRESS_BYTES = 256
+
+# bodies maps a content-coding ('br', 'gzip', 'identity') to the bytes to send
+Asset = namedtuple('Asset', ['content_type', 'digest', 'cache_control', 'bodies'])
+
+def build_asset(body, content_type, cache_control):
+    """Hash and precompress one response body"""
+    bodies = {'identity': body}
+    if content_type.startswith(COMPRESSIBLE_TYPES) and len(body) >= MIN_COMPRESS_BYTES:
+        compressed = gzip.compress(body, compresslevel=9, mtime=0)
+        if len(compressed) < len(body):
+            bodies['gzip'] = compressed
+        if brotli is not None:
+            compressed = brotli.compress(body, quality=11)
+            if len(compressed) < len(body):
+                bodies['br'] = compressed
+
+    return Asset(content_type, hashlib.sha256(body).hexdigest()[:20], cache_control, bodies)
+
+def accepted_encodings(header):
+    """Content-codings the client accepts (q > 0) from an Accept-Encoding header"""
+    accepted = set()
+    for part in (header or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        quality = 1.0
+        if params.strip().startswith('q='):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if coding and quality > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+class StaticAssets:
+    """
+    Frontend files loaded once at startup: each is served under a content-hash
+    URL (app.css -> /static/app.3f2a9c1d.css) with a strong ETag and its gzip
+    and brotli encodings computed up front, so a request only picks bytes.
+    """
+
+    def __init__(self, directory, url_prefix='/static/'):
+        self.url_prefix = url_prefix
+        self.urls = {}     # app.css -> /static/app.<hash>.css
+        self.assets = {}   # app.<hash>.css -> Asset
+
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            if not os.path.isfile(path):
+                continue
+            with open(path, 'rb') as f:
+                body = f.read()
+            content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+            if content_type.startswith('text/') or content_type == 'application/javascript':
+                content_type += '; charset=utf-8'
+
+            stem, ext = os.path.splitext(name)
+            fingerprinted = f'{stem}.{hashlib.sha256(body).hexdigest()[:12]}{ext}'
+            self.assets[fingerprinted] = build_asset(body, content_type, IMMUTABLE_CACHE_CONTROL)
+            self.urls[name] = url_prefix + fingerprinted
+
+    def url(self, name):
+        return self.urls[name]
+
+    def get(self, fingerprinted):
+        return self.assets.get(fingerprinted)
+
+    def stats(self):
+        return {
+            name: {encoding: len(body) for encoding, body in self.assets[url[len(self.url_prefix):]].bodies.items()}
+            for name, url in self.urls.items()
+        }
+
+def respond(asset, accept_encoding=None, if_none_match=None):
+    """(status, headers, body) for serving an Asset to a client"""
+    encoding = 'identity'
+    accepted = accepted_encodings(accept_encoding)
+    for candidate in ('br', 'gzip'):
+        if candidate in asset.bodies and candidate in accepted:
+            encoding = candidate
+            break
+
+    # Each encoding is a different representation, so it gets its own strong ETag
+    etag = f'"{asset.digest}"' if encoding == 'identity' else f'"{asset.digest}-{encoding}"'
+    headers = {
+        'Cache-Control': asset.cache_control,
+        'ETag': etag,
+        'Vary': 'Accept-Encoding',
+    }
+    # Any variant's ETag means the client already has this content
+    if if_none_match and (if_none_match.strip() == '*' or asset.digest in if_none_match):
+        return 304, headers, b''
+
+    body = asset.bodies[encoding]
+    headers['Content-Type'] = asset.content_type
+    if encoding != 'identity':
+        headers['Content-Encoding'] = encoding
+    headers['Content-Length'] = str(len(body))
+    return 200, headers, body
@@ -0,0 +1,211 @@
+"""
+Seeded, vectorized generator of synthetic profiles and linked-account datasets
+for load testing and capacity sizing.
+
+    python synthetic_data.py --users 5000000 --seed 7 --db synthetic.db
+    python synthetic_data.py --profiles 1000000 --seed 7 --parquet synthetic/
+
+The same seed and chunk size always produce the same data.
+"""
+import argparse
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+from bulk_load import LOAD_PRAGMAS, load_chunks
+from migrations import BUMP_GENERATION, GENERATION_TRIGGERS, INDEXES, migrate
+
+DEFAULT_CHUNK_SIZE = 1000000
+
+FIRST_NAMES = np.array(['harini', 'rahul', 'priya', 'arjun', 'sneha', 'vikram',
+                        'john', 'sarah', 'mike', 'emma', 'omar', 'li'])
+FAKE_PREFIXES = np.array(['user', 'official', 'real', 'free', 'promo', 'win'])
+
+def _chunk_rng(seed, chunk_index):
+    # Each chunk has its own stream so chunks can be generated independently
+    return np.random.default_rng([seed, chunk_index])
+
+def generate_profiles(count, seed=0, fake_fraction=0.2, start=0):
+    """
+    Columns of realistic analysis inputs. is_fake is the ground truth: fake
+    accounts get digit-heavy usernames, few followers, many followees and
+    thin profiles.
+    """
+    rng = _chunk_rng(seed, start)
+    ids = np.arange(start, start + count)
+    is_fake = rng.random(count) < fake_fraction
+
+    real_names = np.char.add(np.char.add(FIRST_NAMES[rng.integers(0, len(FIRST_NAMES), count)], '_'), ids.astype(str))
+    fake_names = np.char.add(FAKE_PREFIXES[rng.integers(0, len(FAKE_PREFIXES), count)],
+                             rng.integers(1000, 99999999, count).astype(str))
+    usernames = np.where(is_fake, fake_names, real_names)
+
+    followers = np.where(is_fake, rng.lognormal(3, 1.5, count), rng.lognormal(7, 2, count)).astype(np.int64)
+    following = np.where(is_fake, rng.integers(1000, 7500, count), rng.lognormal(6, 1, count).astype(np.int64))
+    posts = np.where(is_fake, rng.integers(0, 10, count), rng.lognormal(4, 1.2, count).astype(np.int64))
+    bio_length = np.where(is_fake, rng.integers(0, 12, count), rng.integers(0, 150, count))
+
+    return {
+        'username': usernames,
+        'follower_count': followers,
+        'following_count': following,
+        'post_count': posts,
+        'bio_length': bio_length,
+        'is_verified': ~is_fake & (rng.random(count) < 0.02),
+        'is_private': rng.random(count) < 0.3,
+        'is_fake': is_fake,
+    }
+
+def generate_linked_accounts(count, seed=0, ring_fraction=0.05, mean_ring_size=6,
+                             rename_fraction=0.1, start=0):
+    """
+    users and username_history columns for `count` accounts with ids start+1...
+    A ring_fraction of accounts form rings whose members are chained together
+    alternately through shared emails and shared phones; a rename_fraction of
+    accounts get a chain of earlier usernames.
+    """
+    rng = _chunk_rng(seed, start)
+    ids = np.arange(start + 1, start + count + 1)
+    names = FIRST_NAMES[rng.integers(0, len(FIRST_NAMES), count)]
+    usernames = np.char.add(np.char.add(names, '_'), ids.astype(str))
+
+    # Every account starts with its own email and phone
+    email_keys = ids.copy()
+    phone_keys = ids.copy()
+    in_ring = np.zeros(count, dtype=bool)
+
+    # Rings: member i shares its email with member i+1 (even i) and its phone
+    # with member i-1, so identifiers chain across the whole ring. Ring keys
+    # are numbered from the chunk's own id range but live under their own
+    # prefixes, so they never collide with an account's own email or phone in
+    # this chunk or any other.
+    members = rng.permutation(count)[:int(count * ring_fraction)]
+    sizes = np.maximum(2, rng.poisson(mean_ring_size, len(members)))
+    sizes = sizes[np.cumsum(sizes) <= len(members)]
+    if len(sizes):
+        members = members[:sizes.sum()]
+        ring_starts = np.repeat(np.cumsum(sizes) - sizes, sizes)
+        positions = np.arange(len(members)) - ring_starts
+        base = start + 1
+        email_keys[members] = base + ring_starts + positions // 2
+        phone_keys[members] = base + ring_starts + (positions + 1) // 2
+        in_ring[members] = True
+
+    emails = np.char.add(np.char.add(np.where(in_ring, 'ring', 'user'), email_keys.astype(str)), '@example.com')
+    phones = np.char.add(np.where(in_ring, '+44', '+1'), np.char.zfill(phone_keys.astype(str), 10))
+
+    # Rename chains: name_v1 -> name_v2 -> ... -> current username
+    renamed = np.flatnonzero(rng.random(count) < rename_fraction)
+    renames = rng.geometric(0.4, len(renamed))
+    history_index = np.repeat(renamed, renames)
+    version = np.arange(len(history_index)) - np.repeat(np.cumsum(renames) - renames, renames) + 1
+    is_last = version == np.repeat(renames, renames)
+
+    old_usernames = np.char.add(np.char.add(usernames[history_index], '_v'), version.astype(str))
+    new_usernames = np.where(
+        is_last,
+        usernames[history_index],
+        np.char.add(np.char.add(usernames[history_index], '_v'), (version + 1).astype(str)),
+    )
+    # Each chain starts somewhere in the year and moves forward by random gaps
+    gaps = rng.exponential(3 * 86400, len(history_index)).astype(np.int64)
+    elapsed = np.cumsum(gaps)
+    first = np.cumsum(renames) - renames
+    chain_start = rng.integers(0, 365 * 86400, len(renamed))
+    offsets = np.repeat(chain_start, renames) + elapsed - np.repeat(elapsed[first] - gaps[first], renames)
+    changed_at = np.datetime64('2024-01-01T00:00:00') + offsets.astype('timedelta64[s]')
+
+    return {
+        'id': ids,
+        'username': usernames,
+        'email': emails,
+        'phone': phones,
+    }, {
+        'user_id': ids[history_index],
+        'old_username': old_usernames,
+        'new_username': new_usernames,
+        'changed_at': np.char.replace(changed_at.astype(str), 'T', ' '),
+    }
+
+def write_sqlite(db_path, count, seed=0, chunk_size=DEFAULT_CHUNK_SIZE, **options):
+    """Generate `count` linked accounts chunk by chunk straight into SQLite"""
+    conn = sqlite3.connect(db_path)
+    migrate(conn)
+    for name, value in LOAD_PRAGMAS.items():
+        conn.execute(f'PRAGMA {name} = {value}')
+    for index in INDEXES:
+        conn.execute(f'DROP INDEX IF EXISTS {index}')
+    for trigger in GENERATION_TRIGGERS:
+        conn.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+
+    totals = {'users': 0, 'history': 0}
+    try:
+        for start in range(0, count, chunk_size):
+            users, history = generate_linked_accounts(min(chunk_size, count - start), seed, start=start, **options)
+            totals['users'] += load_chunks(
+                conn, 'INSERT INTO users (id, username, email, phone) VALUES (?, ?, ?, ?)',
+                zip(users['id'].tolist(), users['username'].tolist(),
+                    users['email'].tolist(), users['phone'].tolist()),
+                chunk_size,
+            )
+            totals['history'] += load_chunks(
+                conn, 'INSERT INTO username_history (user_id, old_username, new_username, changed_at) VALUES (?, ?, ?, ?)',
+                zip(history['user_id'].tolist(), history['old_username'].tolist(),
+                    history['new_username'].tolist(), history['changed_at'].tolist()),
+                chunk_size,
+            )
+    finally:
+        for statement in INDEXES.values():
+            conn.execute(statement)
+        for statement in GENERATION_TRIGGERS.values():
+            conn.execute(statement)
+        conn.execute(BUMP_GENERATION)
+        conn.execute('ANALYZE')
+        conn.commit()
+        conn.close()
+    return totals
+
+def write_parquet(directory, count, seed=0, chunk_size=DEFAULT_CHUNK_SIZE, **options):
+    """Generate `count` profiles into one Parquet file per chunk"""
+    if pa is None:
+        raise RuntimeError("pyarrow is required for Parquet output (pip install pyarrow)")
+
+    os.makedirs(directory, exist_ok=True)
+    for start in range(0, count, chunk_size):
+        columns = generate_profiles(min(chunk_size, count - start), seed, start=start, **options)
+        table = pa.table({name: pa.array(values) for name, values in columns.items()})
+        pq.write_table(table, os.path.join(directory, f'profiles-{start // chunk_size:05d}.parquet'))
+    return {'profiles': count}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=0, help='linked accounts to write to --db')
+    parser.add_argument('--profiles', type=int, default=0, help='profiles to write to --parquet')
+    parser.add_argument('--db', default='synthetic.db')
+    parser.add_argument('--parquet', default='synthetic')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    if not args.users and not args.profiles:
+        parser.error('nothing to generate: pass --users and/or --profiles')
+
+    start = time.perf_counter()
+    if args.users:
+        totals = write_sqlite(args.db, args.users, args.seed, args.chunk_size)
+        print(f"✅ {totals['users']:,} accounts and {totals['history']:,} username changes written to {args.db}")
+    if args.profiles:
+        write_parquet(args.parquet, args.profiles, args.seed, args.chunk_size)
+        print(f"✅ {args.profiles:,} profiles written to {args.parquet}/")
+    print(f"   - {time.perf_counter() - start:.1f}s")
+
+if __name__ == '__main__':
+    main()
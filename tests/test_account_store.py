@@ -0,0 +1,24 @@
+import sqlite3
+
+from account_store import AccountStore
+from migrations import migrate
+
+def test_snapshot_bio_length_matches_the_live_scorer(tmp_path):
+    db_path = str(tmp_path / 'snapshots.db')
+    conn = sqlite3.connect(db_path)
+    migrate(conn)
+    bios = {'blank': None, 'spaces': '    ', 'mixed': ' \t\r\n ', 'padded': '\n  a real bio  \t'}
+    for seq, (username, bio) in enumerate(bios.items()):
+        conn.execute('''
+            INSERT INTO profile_snapshots (username, follower_count, following_count, post_count, bio,
+                                           is_verified, inputs_hash, risk_score, analyzed_at, changed_at, change_seq)
+            VALUES (?, 100, 100, 10, ?, 1, '', 0, '2024-03-01 00:00:00', '2024-03-01 00:00:00', ?)
+        ''', (username, bio, seq))
+    conn.commit()
+    conn.close()
+
+    store = AccountStore.from_snapshots(db_path, chunk_size=3)
+    for username, bio in bios.items():
+        assert store.record(store.row(username)).bio_length == len((bio or '').strip())
+    # The whitespace-only bios score as empty, exactly as a fresh analysis would
+    assert store.rescore().tolist() == [15, 15, 15, 0]
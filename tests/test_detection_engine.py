@@ -0,0 +1,112 @@
+import sqlite3
+
+import pytest
+
+from detection_engine import CONCLUSIVE_SCORE, InstagramAccountDetector
+from identity_graph import IdentityGraph
+from lookalike_index import LookalikeIndex
+from synthetic_data import write_sqlite
+
+@pytest.fixture
+def db_path(tmp_path):
+    db_path = str(tmp_path / 'detect.db')
+    IdentityGraph(db_path)  # creates the schema
+    return db_path
+
+def detector_for(db_path, *users):
+    conn = sqlite3.connect(db_path)
+    conn.executemany('INSERT INTO users (id, username, email, phone) VALUES (?, ?, ?, ?)', users)
+    conn.commit()
+    conn.close()
+    graph = IdentityGraph(db_path)
+    graph.sync()
+    return InstagramAccountDetector(db_path, identity_graph=graph)
+
+def test_accounts_sharing_one_email_are_not_counted_twice(db_path):
+    # A family sharing one address: the cluster adds nothing beyond the direct matches
+    detector = detector_for(db_path,
+                            (1, 'mum', 'family@example.com', '+1001'),
+                            (2, 'dad', 'family@example.com', '+1002'),
+                            (3, 'kid', 'family@example.com', '+1003'))
+    user_info = detector.search_user('mum')
+
+    assert user_info['cluster_size'] == 3
+    assert detector.suspicion_score(user_info) == 2
+    assert detector.suspicion_score(user_info) < CONCLUSIVE_SCORE
+
+def test_ring_beyond_the_direct_matches_scores(db_path):
+    # a-b share an email, b-c a phone, c-d an email: d is only reachable through the ring
+    detector = detector_for(db_path,
+                            (1, 'ring_a', 'one@example.com', '+1001'),
+                            (2, 'ring_b', 'one@example.com', '+1002'),
+                            (3, 'ring_c', 'two@example.com', '+1002'),
+                            (4, 'ring_d', 'two@example.com', '+1004'))
+    user_info = detector.search_user('ring_a')
+
+    assert user_info['same_email_accounts'] == ['ring_b']
+    assert user_info['cluster_size'] == 4
+    assert detector.suspicion_score(user_info) == 2
+
+def test_only_the_newer_lookalike_is_penalized(db_path):
+    detector = detector_for(db_path,
+                            (1, 'harini_kannan', 'harini@example.com', '+1001'),
+                            (2, 'harini.kannan', 'copy@example.com', '+1002'))
+    detector.lookalike_index = LookalikeIndex(db_path)
+    detector.lookalike_index.sync()
+
+    original = detector.search_user('harini_kannan')
+    impersonator = detector.search_user('harini.kannan')
+    unknown = detector.search_user('harini__kannan')
+
+    assert [match['username'] for match in original['lookalike_accounts']] == ['harini.kannan']
+    assert detector.suspicion_score(original) == 0
+    assert detector.suspicion_score(impersonator) == 2
+    assert 'error' in unknown and detector.suspicion_score(unknown) == 2
+
+def legacy_search_user(conn, username):
+    """search_user as it was before the single-query rewrite: five round trips"""
+    user = conn.execute('SELECT id, username, email, phone FROM users WHERE username = ?', (username,)).fetchone()
+    if not user:
+        return {"error": f"User '{username}' not found in database"}
+    user_id, current_username, email, phone = user
+    same_email = [row[0] for row in conn.execute(
+        'SELECT username FROM users WHERE email = ? AND username != ?', (email, username))]
+    same_phone = [row[0] for row in conn.execute(
+        'SELECT username FROM users WHERE phone = ? AND username != ?', (phone, username))]
+    return {
+        "current_username": current_username,
+        "email": email,
+        "phone": phone,
+        "username_change_count": conn.execute(
+            'SELECT COUNT(*) FROM username_history WHERE user_id = ?', (user_id,)).fetchone()[0],
+        "same_email_accounts": same_email,
+        "same_phone_accounts": same_phone,
+        "username_history": conn.execute(
+            'SELECT old_username, new_username, changed_at FROM username_history WHERE user_id = ? ORDER BY changed_at',
+            (user_id,)).fetchall(),
+        "total_linked_accounts": len(same_email) + len(same_phone) + 1,
+    }
+
+def test_single_query_matches_the_five_query_lookup(tmp_path):
+    db_path = str(tmp_path / 'synthetic.db')
+    write_sqlite(db_path, 3000, seed=7, chunk_size=1000, ring_fraction=0.2, rename_fraction=0.3)
+    detector = InstagramAccountDetector(db_path)
+    conn = sqlite3.connect(db_path)
+    usernames = [row[0] for row in conn.execute('SELECT username FROM users')] + ['nobody']
+
+    linked = renamed = 0
+    for username in usernames:
+        expected = legacy_search_user(conn, username)
+        actual = detector.search_user(username)
+        if 'error' in expected:
+            assert actual == expected
+            continue
+        for key in ('same_email_accounts', 'same_phone_accounts'):
+            expected[key].sort()
+            actual[key] = sorted(actual[key])
+        assert {key: actual[key] for key in expected} == expected
+        linked += bool(expected['same_email_accounts'] or expected['same_phone_accounts'])
+        renamed += bool(expected['username_history'])
+
+    # The comparison covered both kinds of evidence
+    assert linked > 100 and renamed > 100
@@ -0,0 +1,35 @@
+from detection_engine import CONCLUSIVE_SCORE
+from detection_pipeline import DetectionPipeline
+
+class RecordingAnalyzer:
+    def __init__(self):
+        self.fetched = []
+
+    def get_instagram_data(self, username, priority):
+        self.fetched.append(username)
+        return {'username': username, 'risk_score': 10}
+
+class FixedDetector:
+    def __init__(self, score):
+        self.score = score
+
+    def search_user(self, username):
+        return {'success': True, 'current_username': username}
+
+    def suspicion_score(self, user_info):
+        return self.score
+
+    def is_suspicious(self, user_info):
+        return self.score > 0
+
+def test_conclusive_database_result_never_fetches():
+    analyzer = RecordingAnalyzer()
+    result = DetectionPipeline(analyzer, FixedDetector(CONCLUSIVE_SCORE)).detect('ring_member')
+    assert analyzer.fetched == []
+    assert result['verdict'] == 'fake' and result['short_circuited']
+
+def test_inconclusive_database_result_fetches_the_profile():
+    analyzer = RecordingAnalyzer()
+    result = DetectionPipeline(analyzer, FixedDetector(0)).detect('someone')
+    assert analyzer.fetched == ['someone']
+    assert result['verdict'] == 'genuine' and result['profile']['risk_score'] == 10
@@ -0,0 +1,92 @@
+import sqlite3
+
+import pytest
+
+from identity_graph import IdentityGraph
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'graph.db')
+
+@pytest.fixture
+def graph(db_path):
+    return IdentityGraph(db_path)
+
+def add_users(db_path, *users):
+    conn = sqlite3.connect(db_path)
+    conn.executemany('INSERT INTO users (id, username, email, phone) VALUES (?, ?, ?, ?)', users)
+    conn.commit()
+    conn.close()
+
+def test_shared_email_and_phone_chain_into_one_cluster(db_path, graph):
+    add_users(db_path,
+              (1, 'alpha', 'a@example.com', '+1001'),
+              (2, 'bravo', 'a@example.com', '+1002'),
+              (3, 'charlie', 'c@example.com', '+1002'),
+              (4, 'delta', 'd@example.com', '+1004'))
+    assert graph.sync() == 4
+
+    assert graph.cluster('alpha') == ['alpha', 'bravo', 'charlie']
+    assert graph.cluster_size('charlie') == 3
+    assert graph.cluster('delta') == ['delta']
+    assert graph.cluster('nobody') == []
+    assert graph.cluster_size('nobody') == 0
+    assert graph.stats() == {'accounts': 4, 'clusters': 2, 'largest_cluster': 3}
+
+def test_merging_two_clusters_keeps_every_member(db_path, graph):
+    add_users(db_path, *[(user_id, f'left_{user_id}', 'left@example.com', None) for user_id in range(1, 6)],
+              *[(user_id, f'right_{user_id}', 'right@example.com', None) for user_id in range(6, 9)])
+    graph.sync()
+    assert graph.stats()['clusters'] == 2
+
+    # One account sharing a phone with each side joins them
+    add_users(db_path, (9, 'bridge', 'left@example.com', '+1999'), (10, 'other', 'right@example.com', '+1999'))
+    assert graph.sync() == 2
+
+    cluster = graph.cluster('right_6')
+    assert len(cluster) == len(set(cluster)) == 10
+    assert graph.stats() == {'accounts': 10, 'clusters': 1, 'largest_cluster': 10}
+
+def test_reused_handles_do_not_link(db_path, graph):
+    add_users(db_path, (1, 'alice', 'alice@example.com', None), (2, 'dave', 'dave@example.com', None))
+    conn = sqlite3.connect(db_path)
+    # Dave later registered the handle Alice released
+    conn.executemany('INSERT INTO username_history (user_id, old_username, new_username) VALUES (?, ?, ?)',
+                     [(1, 'ally', 'alice'), (2, 'ally', 'dave')])
+    conn.commit()
+    conn.close()
+    graph.sync()
+
+    assert graph.cluster('alice') == ['alice']
+    assert graph.cluster('dave') == ['dave']
+
+def test_clusters_list_current_usernames(db_path, graph):
+    add_users(db_path, (1, 'alice', 'ring@example.com', None), (2, 'bob', 'ring@example.com', None))
+    graph.sync()
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE users SET username = 'alice_new' WHERE id = 1")
+    conn.execute("INSERT INTO username_history (user_id, old_username, new_username) VALUES (1, 'alice', 'alice_new')")
+    conn.commit()
+    conn.close()
+    graph.sync()
+
+    assert graph.cluster('alice_new') == ['alice_new', 'bob']
+    assert graph.cluster('alice') == []
+
+def test_clusters_are_shared_between_instances(db_path, graph):
+    add_users(db_path, (1, 'alpha', 'a@example.com', None), (2, 'bravo', 'a@example.com', None))
+    graph.sync()
+
+    reader = IdentityGraph(db_path)
+    assert reader.cluster('bravo') == ['alpha', 'bravo']
+    # Already folded in by the other instance
+    assert reader.sync() == 0
+
+def test_sync_in_chunks_and_rebuild(db_path, graph):
+    add_users(db_path, *[(user_id, f'user_{user_id}', 'ring@example.com', None) for user_id in range(1, 12)])
+    assert graph.sync(chunk_size=3) == 11
+    assert graph.cluster_size('user_1') == 11
+
+    assert graph.rebuild() == 11
+    assert graph.stats() == {'accounts': 11, 'clusters': 1, 'largest_cluster': 11}
@@ -0,0 +1,77 @@
+import sqlite3
+
+import pytest
+
+from lookalike_index import LookalikeIndex, edit_distance, query_keys, skeleton
+
+def test_skeleton_ignores_case_and_separators():
+    assert skeleton('Harini.Kannan') == skeleton('harini_kannan') == skeleton('HARINI-KANNAN')
+
+def test_skeleton_maps_homoglyphs_and_digraphs():
+    assert skeleton('hаrini') == skeleton('harini')     # Cyrillic 'а'
+    assert skeleton('har1n1') == skeleton('harini')
+    assert skeleton('c0rner') == skeleton('comer')       # '0' -> 'o', 'rn' -> 'm'
+    assert skeleton('ｈａｒｉｎｉ') == skeleton('harini')   # full-width, via NFKC
+
+def test_query_keys_strip_a_trailing_number():
+    assert query_keys('cristiano_2024') == {skeleton('cristiano_2024'), skeleton('cristiano')}
+    assert query_keys('cristiano') == {skeleton('cristiano')}
+    # Too little left after stripping to mean anything
+    assert query_keys('jo_123') == {skeleton('jo_123')}
+
+def test_edit_distance():
+    assert edit_distance('harini', 'harini') == 0
+    assert edit_distance('harini', 'harlni') == 1
+    assert edit_distance('harini', 'hairni') == 1   # transposition
+    assert edit_distance('harini', 'harinii') == 1
+    assert edit_distance('harini', 'xyzabc') == 2   # limit + 1 once past the limit
+    assert edit_distance('harini', 'har') == 2
+    assert edit_distance('abc', 'xyz', limit=5) == 3
+
+@pytest.fixture
+def index(tmp_path):
+    db_path = str(tmp_path / 'lookalike.db')
+    index = LookalikeIndex(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.executemany('INSERT INTO users (id, username) VALUES (?, ?)', [
+        (1, 'harini_kannan'),
+        (2, 'cristiano'),
+        (3, 'cristiano_1001'),
+        (4, 'cristiano_2002'),
+        (5, 'mike_jones'),
+    ])
+    conn.execute("INSERT INTO username_history (user_id, old_username, new_username) VALUES (5, 'priya.sharma', 'mike_jones')")
+    conn.commit()
+    conn.close()
+    index.sync()
+    return index
+
+def matched(index, username):
+    return {match['username']: match['distance'] for match in index.search(username)}
+
+def test_search_finds_disguised_handles(index):
+    assert matched(index, 'harini.kannan') == {'harini_kannan': 0}
+    assert matched(index, 'hаrini_kannan') == {'harini_kannan': 0}   # Cyrillic 'а'
+    assert matched(index, 'harini_kanan') == {'harini_kannan': 1}
+
+def test_search_matches_past_usernames(index):
+    assert index.search('priya_sharma') == [{
+        'user_id': 5, 'username': 'mike_jones', 'matched_handle': 'priya.sharma', 'distance': 0,
+    }]
+
+def test_trailing_number_is_stripped_only_from_the_query(index):
+    assert matched(index, 'cristiano_2024') == {'cristiano': 0}
+    # Indexed handles keep their numbers, so numbered siblings do not match each other
+    assert 'cristiano_1001' not in matched(index, 'cristiano_3003')
+
+def test_search_skips_the_handle_itself(index):
+    assert 'harini_kannan' not in matched(index, 'Harini_Kannan')
+
+def test_sync_is_incremental(index):
+    conn = sqlite3.connect(index.db_path)
+    conn.execute("INSERT INTO users (id, username) VALUES (6, 'sneha_rao')")
+    conn.commit()
+    conn.close()
+
+    assert index.sync() == {'users': 1, 'history': 0}
+    assert matched(index, 'sneha.rao') == {'sneha_rao': 0}
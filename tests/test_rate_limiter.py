@@ -0,0 +1,85 @@
+import threading
+import time
+
+from rate_limiter import BATCH, INTERACTIVE, RateLimiter, retry_after_seconds
+
+def drained(rate):
+    limiter = RateLimiter(rate, burst=1)
+    assert limiter.acquire(timeout=0)
+    return limiter
+
+def queue_up(limiter, order, name, priority):
+    def take():
+        assert limiter.acquire(priority, timeout=5)
+        order.append(name)
+    thread = threading.Thread(target=take)
+    waiting = limiter.stats()['waiting']
+    thread.start()
+    # Wait until the caller is queued before the next one arrives
+    deadline = time.monotonic() + 1
+    while limiter.stats()['waiting'] == waiting and time.monotonic() < deadline:
+        time.sleep(0.001)
+    return thread
+
+def test_interactive_is_served_before_earlier_batch_callers():
+    limiter = drained(rate=20)
+    order = []
+    threads = [queue_up(limiter, order, 'batch-1', BATCH),
+               queue_up(limiter, order, 'batch-2', BATCH),
+               queue_up(limiter, order, 'interactive', INTERACTIVE)]
+    for thread in threads:
+        thread.join()
+
+    assert order == ['interactive', 'batch-1', 'batch-2']
+    assert limiter.stats()['granted'] == 4
+
+def test_acquire_times_out_and_leaves_the_queue():
+    limiter = drained(rate=0.1)
+
+    start = time.monotonic()
+    assert not limiter.acquire(timeout=0.05)
+    assert time.monotonic() - start >= 0.05
+
+    stats = limiter.stats()
+    assert stats['timeouts'] == 1
+    assert stats['waiting'] == 0
+
+def test_timed_out_head_does_not_block_later_callers():
+    limiter = drained(rate=10)
+    order = []
+    slow = threading.Thread(target=lambda: order.append(limiter.acquire(INTERACTIVE, timeout=0.01)))
+    slow.start()
+    slow.join()
+    assert limiter.acquire(BATCH, timeout=1)
+    assert order == [False]
+
+def test_penalize_stops_grants_until_the_pause_ends():
+    limiter = RateLimiter(rate=1000, burst=5)
+    limiter.penalize(0.2)
+
+    assert not limiter.acquire(timeout=0.05)
+    assert limiter.reserve() > 0
+
+    start = time.monotonic()
+    assert limiter.acquire(timeout=1)
+    assert time.monotonic() - start >= 0.1
+    assert limiter.stats()['throttled'] == 1
+
+def test_penalize_keeps_the_longest_pause():
+    limiter = RateLimiter(rate=1000, burst=5)
+    limiter.penalize(0.5)
+    limiter.penalize(0.01)
+    assert limiter.stats()['paused_for_seconds'] > 0.4
+
+def test_reserve_takes_tokens_then_reports_the_wait():
+    limiter = RateLimiter(rate=10, burst=2)
+    assert limiter.reserve() == 0
+    assert limiter.reserve() == 0
+    assert 0 < limiter.reserve() <= 0.1
+
+def test_retry_after_seconds():
+    assert retry_after_seconds('3') == 3.0
+    assert retry_after_seconds('-5') == 0.0
+    assert retry_after_seconds('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+    assert retry_after_seconds('soon') is None
+    assert retry_after_seconds(None) is None
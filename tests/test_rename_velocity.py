@@ -0,0 +1,99 @@
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from detection_engine import LINKED_ACCOUNTS_QUERY, InstagramAccountDetector
+from migrations import migrate
+from rename_velocity import RenameTimeline
+
+START = datetime(2024, 3, 1)
+
+# username -> hours between consecutive renames
+RENAME_GAPS = {
+    'burst': [0, 6, 14],             # 3 renames inside 24h
+    'weekly': [0] + [36] * 4,        # 5 renames inside 7 days
+    'monthly': [0] + [84] * 7,       # 8 renames inside 30 days
+    'quiet': [],
+}
+
+@pytest.fixture
+def db_path(tmp_path):
+    db_path = str(tmp_path / 'renames.db')
+    conn = sqlite3.connect(db_path)
+    migrate(conn)
+    for user_id, (username, gaps) in enumerate(RENAME_GAPS.items(), start=1):
+        conn.execute('INSERT INTO users (id, username, email, phone) VALUES (?, ?, ?, ?)',
+                     (user_id, username, f'{username}@example.com', f'+1{user_id:04d}'))
+        changed_at = START
+        for version, gap in enumerate(gaps, start=1):
+            changed_at += timedelta(hours=gap)
+            conn.execute(
+                'INSERT INTO username_history (user_id, old_username, new_username, changed_at) VALUES (?, ?, ?, ?)',
+                (user_id, f'{username}_v{version}', username if version == len(gaps) else f'{username}_v{version + 1}',
+                 changed_at.strftime('%Y-%m-%d %H:%M:%S'))
+            )
+    conn.commit()
+    conn.close()
+    return db_path
+
+def usernames(bursts):
+    return [burst['username'] for burst in bursts]
+
+def test_bursts_per_window(db_path):
+    timeline = RenameTimeline(db_path)
+    assert usernames(timeline.bursts(3, '24h')) == ['burst']
+    assert usernames(timeline.bursts(5, '7d')) == ['weekly']
+    assert usernames(timeline.bursts(8, '30d')) == ['monthly']
+    # Tightest burst first
+    assert usernames(timeline.bursts(3, '7d')) == ['burst', 'weekly', 'monthly']
+
+def test_burst_span(db_path):
+    burst, = RenameTimeline(db_path).bursts(3, '24h')
+    assert burst['burst_start'] == '2024-03-01 00:00:00'
+    assert burst['burst_end'] == '2024-03-01 20:00:00'
+    assert burst['span_hours'] == 20.0
+
+def test_bursts_since(db_path):
+    timeline = RenameTimeline(db_path)
+    assert usernames(timeline.bursts(3, '24h', since='2024-02-01 00:00:00')) == ['burst']
+    assert timeline.bursts(3, '24h', since='2024-03-02 00:00:00') == []
+    # monthly keeps renaming after the others stop
+    assert usernames(timeline.bursts(3, '7d', since='2024-03-10 00:00:00')) == ['monthly']
+
+def test_bursts_rejects_bad_arguments(db_path):
+    timeline = RenameTimeline(db_path)
+    with pytest.raises(ValueError):
+        timeline.bursts(3, '12h')
+    with pytest.raises(ValueError):
+        timeline.bursts(1)
+
+def test_timeline_and_velocity(db_path):
+    timeline = RenameTimeline(db_path)
+    assert [entry['renames_24h'] for entry in timeline.timeline('burst')] == [1, 2, 3]
+    assert timeline.velocity('monthly') == {'24h': 1, '7d': 3, '30d': 8}
+    assert timeline.timeline('quiet') == []
+
+def test_linked_accounts_query_rows(db_path):
+    conn = sqlite3.connect(db_path)
+    kinds = [row[0] for row in conn.execute(LINKED_ACCOUNTS_QUERY, ('burst',))]
+    assert kinds == [0, 3, 3, 3, 4]
+    # No velocity row without renames, and nothing at all for an unknown user
+    assert [row[0] for row in conn.execute(LINKED_ACCOUNTS_QUERY, ('quiet',))] == [0]
+    assert conn.execute(LINKED_ACCOUNTS_QUERY, ('nobody',)).fetchall() == []
+
+def test_search_user_rename_velocity(db_path):
+    detector = InstagramAccountDetector(db_path)
+
+    burst = detector.search_user('burst')
+    assert burst['rename_velocity'] == {'24h': 3, '7d': 3, '30d': 3}
+    assert burst['rename_burst']
+    assert burst['username_change_count'] == 3
+    assert [change[2] for change in burst['username_history']] == sorted(change[2] for change in burst['username_history'])
+
+    quiet = detector.search_user('quiet')
+    assert quiet['rename_velocity'] == {'24h': 0, '7d': 0, '30d': 0}
+    assert not quiet['rename_burst']
+    assert quiet['username_history'] == []
+
+    assert 'error' in detector.search_user('nobody')
@@ -0,0 +1,92 @@
+import threading
+import time
+
+import pytest
+
+from request_coalescer import RequestCoalescer
+
+FOLLOWERS = 5
+
+def wait_for_followers(coalescer, count):
+    deadline = time.monotonic() + 2
+    while coalescer.stats()['followers'] < count and time.monotonic() < deadline:
+        time.sleep(0.001)
+    assert coalescer.stats()['followers'] == count
+
+def run_followers(coalescer, key, outcomes):
+    def follow():
+        try:
+            outcomes.append(coalescer.run(key, lambda: pytest.fail('a follower ran the call')))
+        except Exception as e:
+            outcomes.append(e)
+    threads = [threading.Thread(target=follow) for _ in range(FOLLOWERS)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+def test_concurrent_callers_share_the_leaders_result():
+    coalescer = RequestCoalescer()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(2)
+        return {'username': 'harini'}
+
+    leader = []
+    leader_thread = threading.Thread(target=lambda: leader.append(coalescer.run('harini', fetch)))
+    leader_thread.start()
+    while not calls:
+        time.sleep(0.001)
+
+    outcomes = []
+    threads = run_followers(coalescer, 'harini', outcomes)
+    wait_for_followers(coalescer, FOLLOWERS)
+    release.set()
+    for thread in [leader_thread, *threads]:
+        thread.join()
+
+    assert len(calls) == 1
+    assert leader == [({'username': 'harini'}, False)]
+    assert outcomes == [({'username': 'harini'}, True)] * FOLLOWERS
+    assert coalescer.stats() == {'in_flight': 0, 'leaders': 1, 'followers': FOLLOWERS}
+
+def test_leader_error_reaches_every_follower_and_is_not_cached():
+    coalescer = RequestCoalescer()
+    release = threading.Event()
+    started = threading.Event()
+
+    def fetch():
+        started.set()
+        release.wait(2)
+        raise ValueError('upstream down')
+
+    leader = []
+    def lead():
+        try:
+            coalescer.run('harini', fetch)
+        except ValueError as e:
+            leader.append(e)
+    leader_thread = threading.Thread(target=lead)
+    leader_thread.start()
+    started.wait(2)
+
+    outcomes = []
+    threads = run_followers(coalescer, 'harini', outcomes)
+    wait_for_followers(coalescer, FOLLOWERS)
+    release.set()
+    for thread in [leader_thread, *threads]:
+        thread.join()
+
+    assert len(leader) == 1
+    assert all(outcome is leader[0] for outcome in outcomes) and len(outcomes) == FOLLOWERS
+    # The failed call is forgotten, so the next caller leads a fresh attempt
+    assert coalescer.run('harini', lambda: 'recovered') == ('recovered', False)
+    assert coalescer.stats()['in_flight'] == 0
+
+def test_different_keys_do_not_coalesce():
+    coalescer = RequestCoalescer()
+    assert coalescer.run('a', lambda: 1) == (1, False)
+    assert coalescer.run('b', lambda: 2) == (2, False)
+    assert coalescer.stats()['leaders'] == 2
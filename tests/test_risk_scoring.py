@@ -0,0 +1,63 @@
+import itertools
+
+import pytest
+
+from risk_scoring import risk_score, risk_scores, simulated_risk_score, simulated_risk_scores
+
+# Followers against 100 following lands exactly on each ratio bound (0.01, 0.1, 0.5) and either side of it
+FOLLOWERS = [0, 1, 2, 9, 10, 11, 49, 50, 51, 100, 100_000, 1_000_000]
+FOLLOWING = [0, 1, 100]
+POSTS = [0, 1, 4, 5, 9, 10, 11, 1000]
+BIOS = ['', '   ', '\t\n\r ', 'short', '123456789', '1234567890', '  padded  ', 'a proper biography']
+USERNAME_LENGTHS = [1, 4, 5, 30]
+
+def as_columns(rows):
+    return [list(column) for column in zip(*rows)]
+
+def test_vectorized_risk_score_matches_scalar():
+    rows = [
+        (followers, following, posts, len(bio.strip()), verified)
+        for followers, following, posts, bio, verified
+        in itertools.product(FOLLOWERS, FOLLOWING, POSTS, BIOS, (False, True))
+    ]
+    expected = [risk_score(*row) for row in rows]
+    assert risk_scores(*as_columns(rows)).tolist() == expected
+
+@pytest.mark.parametrize('followers, following, expected', [
+    (1, 100, 25),      # ratio exactly 0.01 is no longer below the first bound
+    (0, 100, 40),
+    (10, 100, 10),     # exactly 0.1
+    (50, 100, 0),      # exactly 0.5
+    (0, 0, 0),         # follows nobody: no ratio points
+])
+def test_follower_ratio_bounds(followers, following, expected):
+    # 10 posts, a long bio and verified leave only the ratio points
+    row = (followers, following, 10, 20, True)
+    assert risk_score(*row) == expected
+    assert risk_scores(*as_columns([row])).tolist() == [expected]
+
+def test_whitespace_only_bio_counts_as_empty():
+    bio_length = len(' \t\n          \r\n'.strip())
+    row = (100, 100, 10, bio_length, True)
+    assert risk_score(*row) == 15
+    assert risk_scores(*as_columns([row])).tolist() == [15]
+
+def test_vectorized_simulated_risk_score_matches_scalar():
+    # With 1, 10 and 1000 posts the follower/post ratio lands exactly on 1 and 1000
+    rows = list(itertools.product(USERNAME_LENGTHS, (False, True), (False, True),
+                                  FOLLOWERS + [1000, 1001, 10_000, 10_010], POSTS))
+    expected = [simulated_risk_score(*row) for row in rows]
+    assert simulated_risk_scores(*as_columns(rows)).tolist() == expected
+
+@pytest.mark.parametrize('followers, posts, expected', [
+    (1000, 1, 20),      # ratio exactly 1000 scores only the low-post points
+    (1001, 1, 40),
+    (10, 10, 0),        # ratio exactly 1
+    (9, 10, 15),
+    (0, 0, 20),         # no posts: no ratio points
+    (5_000_000, 0, 20),
+])
+def test_follower_post_ratio_bounds(followers, posts, expected):
+    row = (10, False, False, followers, posts)
+    assert simulated_risk_score(*row) == expected
+    assert simulated_risk_scores(*as_columns([row])).tolist() == [expected]
@@ -0,0 +1,45 @@
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+FEATURE_CACHE_SIZE = 65536
+
+# All username signals in one precompiled pattern so a single scan finds them
+_SIGNALS = re.compile(r'(?P<digits>\d{4})|(?P<separators>[._-]{3})|(?P<brand>(?i:official|real|verified))')
+
+class UsernameFeatures(namedtuple('UsernameFeatures', [
+    'length',             # number of characters
+    'has_digit_run',      # 4+ consecutive digits
+    'has_separator_run',  # 3+ consecutive '.', '_' or '-'
+    'has_brand_keyword',  # contains official/real/verified (any case)
+])):
+    __slots__ = ()
+
+    @classmethod
+    def from_username(cls, username):
+        """Memoized feature extraction shared by the simulation and scoring paths"""
+        return _extract(username)
+
+@lru_cache(maxsize=FEATURE_CACHE_SIZE)
+def _extract(username):
+    found = set()
+    for match in _SIGNALS.finditer(username):
+        found.add(match.lastgroup)
+        if len(found) == 3:
+            break
+
+    return UsernameFeatures(
+        length=len(username),
+        has_digit_run='digits' in found,
+        has_separator_run='separators' in found,
+        has_brand_keyword='brand' in found,
+    )
+
+def cache_stats():
+    info = _extract.cache_info()
+    return {
+        'hits': info.hits,
+        'misses': info.misses,
+        'entries': info.currsize,
+        'max_entries': info.maxsize,
+    }